@@ -1,195 +1,340 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 import csv
-import copy
 import argparse
-import itertools
+import queue
+import signal
+import threading
 import time
-import pyautogui  # For controlling slides
-from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Taken before the third-party imports so the startup profile includes them.
+# mediapipe and the TFLite runtime are imported later, on a worker thread
+_IMPORT_START = time.perf_counter()
 
 import cv2 as cv
 import numpy as np
-import mediapipe as mp
 
-from utils import CvFpsCalc
+from utils import StageMetrics
+from utils import FrameCapture
+from utils import FramePipeline
+from utils import FrameBufferPool
+from utils import SessionRecorder
+from utils import HandDetector
+from utils import DetectionScheduler
+from utils import StartupProfile
+from utils import GestureSmoother
+from utils import PointHistory
+from utils import DemandGraph
+from utils import HandTracker
+from utils.landmarks import (calc_bounding_rect, calc_landmark_list,
+                             pre_process_landmark)
 from model import KeyPointClassifier
 from model import PointHistoryClassifier
-from scripts.swipe_control import detect_swipe # For Swipe features
-from scripts.zoom_control import ZoomController # For Zoom features
-from scripts.spotlight_control import SpotlightController # For Spotlight features
-from scripts.move_control import MoveController # For move features
+from scripts.actions import ActionDispatcher
+from scripts.presentation_control import MultiHandController
+from scripts.presentation_control import tracked_point
+
+_IMPORT_END = time.perf_counter()
 
 #*************************************************************************************************************#
-# Constants
-THREE_FINGER_ID = 4  # Custom '3-finger' hand sign for swiping
-PINCH_IN_ID = 10 # Custom 'pinch in' hand sign for zooming in
-PINCH_OUT_ID = 11 # Custom 'pinch out' hand sign for zooming out
-TWO_FINGER_ID = 10 # Custom '2-finger' hand sign for moving
-POINTING_ID = 2  # Custom 'pointer' hand sign for spotlight
-OK_HAND_ID = 3 # Custom 'Ok' hand sign for spotlight
-
-class PresentationController:
-    def __init__(self, cam_width, cam_height):
-        self.swipe_state = "idle"
-        self.last_swipe_time = 0
-        self.swipe_cooldown = 0.7 # seconds between allowed swipes
-        
-        self.zoom_controller = ZoomController()
-        self.move_controller = MoveController()
-
-        self.spotlight_controller = SpotlightController()
-        self.pointer_hold_counter = 0
-        self.pointer_hold_threshold = 15  # Number of consecutive frames required
-        self.ok_hand_deactivate_threshold = 6
-        self.cam_width = cam_width
-        self.cam_height = cam_height
-        self.x_min, self.x_max = 100, self.cam_width - 100
-        self.y_min, self.y_max = 100, self.cam_height - 100
-        self.prev_spotlight_pos = None
-        self.smoothing_factor = 0.2  # 0 = no smoothing, 1 = no movement
-
-    
-    def handle_gestures(self, hand_sign_id, fingure_gesture_id, landmark_list, point_history):
-        current_time = time.time()
-
-        # 3-finger swipe detection ###############################################################
-        if hand_sign_id == THREE_FINGER_ID:
-            if len(point_history) >= 2:
-                # Only detect new swipes if cooldown has passed and we're not already swiping
-                if current_time - self.last_swipe_time > self.swipe_cooldown and self.swipe_state != "swiping":
-                    direction = detect_swipe(point_history)
-                    if direction:
-                        self.swipe_state = "swiping"
-                        self.last_swipe_direction = direction
-                
-                # Detect when swipe ends (finger stops moving significantly)
-                if self.swipe_state == "swiping" and self._swipe_ended(point_history):
-                    self._execute_swipe_action(self.last_swipe_direction)
-                    self.swipe_state = "idle"
-                    self.last_swipe_time = current_time
-    
-        # Pointing Gesture (Spotlight)
-
-        # Pinch gestures (zoom)
-        if hand_sign_id == PINCH_OUT_ID:
-            self.zoom_controller.zoom("in")
-        elif hand_sign_id == PINCH_IN_ID:
-            self.zoom_controller.zoom("out")
-
-        # Two-finger drag for moving zoomed screen
-        if hand_sign_id == TWO_FINGER_ID:
-            self.move_controller.move_cursor(landmark_list[8])  # track index finger
-        
-        # Spotlight control logic
-        if hand_sign_id == POINTING_ID:
-            self.pointer_hold_counter = min(self.pointer_hold_counter + 1, self.pointer_hold_threshold)
-            if self.pointer_hold_counter >= self.pointer_hold_threshold:
-                # Only take new screenshot if we're activating spotlight now
-                force_refresh = not self.spotlight_controller.enabled
-                index_finger = tuple(map(int, landmark_list[8]))
-                
-                # Update dynamic min/max observed
-                self.x_min = min(self.x_min, index_finger[0])
-                self.x_max = max(self.x_max, index_finger[0])
-                self.y_min = min(self.y_min, index_finger[1])
-                self.y_max = max(self.y_max, index_finger[1])
-                
-                # Clipping finger within known observed range
-                cam_x = max(self.x_min, min(index_finger[0], self.x_max))
-                cam_y = max(self.y_min, min(index_finger[1], self.y_max))
-                clamped_finger = (cam_x, cam_y)
-                
-                # Map to screen coordinates
-                target_pos = self.dynamic_map_to_screen(clamped_finger)
-
-                # Smoothing logic
-                if not hasattr(self, 'prev_spotlight_pos'):
-                    self.prev_spotlight_pos = None
-                if not hasattr(self, 'smoothing_factor'):
-                    self.smoothing_factor = 0.2  # tweak to your liking
-
-                if self.prev_spotlight_pos is None:
-                    smoothed_pos = target_pos
-                else:
-                    smoothed_pos = (
-                        int(self.prev_spotlight_pos[0] * (1 - self.smoothing_factor) + target_pos[0] * self.smoothing_factor),
-                        int(self.prev_spotlight_pos[1] * (1 - self.smoothing_factor) + target_pos[1] * self.smoothing_factor)
-                    )
-                self.prev_spotlight_pos = smoothed_pos
-
-                self.spotlight_controller.show_spotlight(smoothed_pos, force_refresh)
-
-        # Only deactivate spotlight with OK hand gesture
-        elif hand_sign_id == OK_HAND_ID and self.spotlight_controller.enabled:
-            self.pointer_hold_counter = max(self.pointer_hold_counter - 1, -self.ok_hand_deactivate_threshold)
-            if self.pointer_hold_counter <= -self.ok_hand_deactivate_threshold:
-                self.spotlight_controller.hide_spotlight()
-                self.pointer_hold_counter = 0
-                self.prev_spotlight_pos = None
-        else:
-            # For other gestures, slowly reset counter but keep spotlight active
-            if not self.spotlight_controller.enabled:
-                self.pointer_hold_counter = 0
-            elif abs(self.pointer_hold_counter) > 0:  # Slowly return to zero if not pointing/ok
-                self.pointer_hold_counter = int(self.pointer_hold_counter * 0.8)  # Decay factord:
-                self.pointer_hold_counter = 0
-
-        # Reset swipe state if not in swipe gesture
-        if hand_sign_id != THREE_FINGER_ID:
-            self.swipe_state = "idle"
-        
-        # Reset move controller when gesture ends
-        if hand_sign_id != TWO_FINGER_ID:
-            self.move_controller.reset()
-
-    def dynamic_map_to_screen(self, cam_pos):
-        cam_x, cam_y = cam_pos
-        screen_width, screen_height = pyautogui.size()
-
-        # Prevent division by zero
-        x_range = max(self.x_max - self.x_min, 1)
-        y_range = max(self.y_max - self.y_min, 1)
-
-        # Normalize cam_x to [0,1] based on visible range
-        norm_x = (cam_x - self.x_min) / x_range
-        norm_y = (cam_y - self.y_min) / y_range
-
-        screen_x = int(norm_x * screen_width)
-        screen_y = int(norm_y * screen_height)
-        return (screen_x, screen_y)
-
-
-    def _swipe_ended(self, point_history):
-        """Check if finger movement has stopped below threshold"""
-        if len(point_history) < 3:
-            return False
-        
-        # Get last few points (excluding zeros)
-        recent_points = [p for p in list(point_history)[-3:] if p != [0, 0]]
-        if len(recent_points) < 2:
-            return False
-            
-        # Calculate recent movement
-        total_movement = sum(
-            abs(recent_points[i+1][0] - recent_points[i][0]) 
-            for i in range(len(recent_points)-1)
-        )
-        return total_movement < 3  # Pixels threshold for "stopped moving"
-
-    def _execute_swipe_action(self, direction):
-        """Execute slide change with debounce checking"""
-        if direction == "left":
-            pyautogui.press('right')  # Next slide
-        elif direction == "right":
-            pyautogui.press('left')   # Previous slide
-        print(f"Slide changed: {direction}")  # Debug output
-
-def map_camera_to_screen(cam_x, cam_y, cam_width, cam_height):
-    screen_width, screen_height = pyautogui.size()
-    screen_x = int(cam_x / cam_width * screen_width)
-    screen_y = int(cam_y / cam_height * screen_height)
-    return (screen_x, screen_y)
+# Frame pipeline
+
+class HandResult(object):
+    """Detection and classification output for one hand in a frame"""
+    def __init__(self, brect, landmark_list, handedness, hand_sign_id,
+                 finger_gesture_id, track_id=0, point_history=None):
+        self.brect = brect
+        self.landmark_list = landmark_list
+        self.handedness = handedness
+        self.hand_sign_id = hand_sign_id
+        self.finger_gesture_id = finger_gesture_id
+        self.track_id = track_id
+        self.point_history = point_history  # Snapshot taken after this frame
+
+
+class HandState(object):
+    """What FrameProcessor remembers about one tracked hand"""
+    def __init__(self, history_length, sign_smoothing):
+        self.point_history = PointHistory(history_length)
+        # Hand signs are voted over a few frames before they reach the
+        # controllers, finger gestures over the whole point history. Plain
+        # counts, so replay.py reproduces the vote from recorded raw IDs
+        self.sign_smoother = GestureSmoother(window=sign_smoothing)
+        self.finger_gesture_smoother = GestureSmoother(window=history_length)
+
+
+class FramePacket(object):
+    """Everything the pipeline stages know about one camera frame"""
+    def __init__(self, frame_id, timestamp, image):
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self.image = image  # Mirrored BGR frame, drawn on for the preview
+        self.detections = []  # DetectedHand list from the detect stage
+        self.predicted = False  # Detections carried forward by the DetectionScheduler
+        self.hands = []
+        self.track_ids = []  # Every live hand track, including ones missed this frame
+
+
+def build_demand_graph():
+    """What each per-hand computation in FrameProcessor.classify is for.
+
+    A node runs when its condition holds for the frame, or when a node that
+    runs depends on it. Everything else is skipped and counted in the
+    metrics as skipped.<node>.
+    """
+    return DemandGraph({
+        # The controllers act on the hand sign every frame
+        'landmark_features': ((), None),
+        'hand_sign': (('landmark_features',), lambda context: True),
+        # Only drawn on the preview
+        'bounding_rect': ((), lambda context: context['preview']),
+        # handle_gestures ignores the finger gesture, it only feeds the
+        # preview label. It only means something while the finger is
+        # tracked, and the fullscreen spotlight overlay hides the preview
+        'point_history_features': ((), None),
+        'finger_gesture': (('point_history_features',),
+                           lambda context: context['preview'] and context['tracking']
+                           and not context['spotlight_enabled']),
+        # Dataset collection (k / h + a number key)
+        'keypoint_logging': (('landmark_features',),
+                             lambda context: context['logging_mode'] == 1),
+        'point_history_logging': (('point_history_features',),
+                                  lambda context: context['logging_mode'] == 2),
+    })
+
+
+class FrameProcessor(object):
+    """Stage functions of the frame pipeline.
+
+    capture, detect and classify each run on their own pipeline worker, so
+    the state they mutate (per-hand point and gesture history, kept per
+    track ID) is only ever touched by the classify thread. Stages further
+    down get snapshots.
+
+    The frame path does not allocate at steady state: the mirrored frame is
+    written into a pooled buffer that detection reads from and the preview
+    draws on, and the RGB conversion reuses one buffer owned by the detect
+    stage. Call release() once a packet is done with.
+
+    Every step records its latency into `metrics` (a StageMetrics).
+    """
+    def __init__(self, capture, detector, keypoint_classifier,
+                 point_history_classifier, history_length=16, recorder=None,
+                 metrics=None, scheduler=None, sign_smoothing=5, preview=True,
+                 controller=None):
+        self.frame_capture = capture
+        self.detector = detector
+        self.keypoint_classifier = keypoint_classifier
+        self.point_history_classifier = point_history_classifier
+        self.history_length = history_length
+        self.recorder = recorder  # Optional SessionRecorder
+        self.metrics = metrics or StageMetrics()
+        self.scheduler = scheduler  # Optional DetectionScheduler
+        self.preview = preview
+        self.controller = controller  # MultiHandController, state is only read
+        self.demand_graph = build_demand_graph()
+
+        self.sign_smoothing = sign_smoothing
+        self.tracker = HandTracker()
+        self.hand_states = {}  # track ID -> HandState
+
+        self.frame_pool = FrameBufferPool((0, 0, 3))
+        self._rgb_image = None
+        self._rgb_allocations = 0
+        self._detect_latency = None
+
+        # Dataset logging keys, written by the main thread
+        self.number = -1
+        self.mode = 0
+
+    def capture(self):
+        ret, image = self.frame_capture.read()
+        if not ret:
+            return None
+        # How long the frame sat in the capture buffer before we got to it
+        self.metrics.record('capture', time.time() - self.frame_capture.timestamp)
+
+        # Flipping also copies the frame out of the capture ring buffer
+        start = time.perf_counter()
+        mirrored = self.frame_pool.acquire(image.shape)
+        cv.flip(image, 1, dst=mirrored)  # Mirror display
+        self.metrics.record('flip', time.perf_counter() - start)
+        return FramePacket(self.frame_capture.frame_id,
+                           self.frame_capture.timestamp, mirrored)
+
+    def detect(self, packet):
+        if self.scheduler is not None and not self.scheduler.should_detect():
+            # Carry the last landmarks forward instead of running MediaPipe
+            start = time.perf_counter()
+            packet.detections = self.scheduler.predict()
+            packet.predicted = True
+            self.metrics.record('predict', time.perf_counter() - start)
+            return packet
+
+        if self._rgb_image is None or self._rgb_image.shape != packet.image.shape:
+            self._rgb_image = np.empty_like(packet.image)
+            self._rgb_allocations += 1
+        image = self._rgb_image
+
+        start = time.perf_counter()
+        image.flags.writeable = True
+        cv.cvtColor(packet.image, cv.COLOR_BGR2RGB, dst=image)
+        self.metrics.record('convert', time.perf_counter() - start)
+
+        start = time.perf_counter()
+        image.flags.writeable = False
+        packet.detections = self.detector.process(image, self._detect_latency)
+        self._detect_latency = time.perf_counter() - start
+        self.metrics.record('hands.process', self._detect_latency)
+        if self.scheduler is not None:
+            self.scheduler.update(packet.detections)
+        return packet
+
+    def release(self, packet):
+        """Return the packet's frame buffer to the pool"""
+        self.frame_pool.release(packet.image)
+        packet.image = None
+
+    @property
+    def allocations(self):
+        """Frame-sized arrays allocated so far, constant at steady state"""
+        return (self.frame_capture.allocations + self.frame_pool.allocations +
+                self._rgb_allocations)
+
+    def _spotlight_enabled(self):
+        return (self.controller is not None and
+                self.controller.spotlight_controller.enabled)
+
+    def classify(self, packet):
+        number, mode = self.number, self.mode
+        image_height, image_width = packet.image.shape[:2]
+        recorded_hands = []
+        raw_hand_sign_ids = ()
+
+        track_ids, missed, dropped = self.tracker.update(packet.detections)
+        for track_id in dropped:
+            del self.hand_states[track_id]
+        for track_id in missed:
+            state = self.hand_states[track_id]
+            state.point_history.append([0, 0], packet.timestamp)
+            # A hand that comes back starts a fresh vote
+            state.sign_smoother.reset()
+        packet.track_ids = self.tracker.active_ids()
+
+        if packet.detections:
+            start = time.perf_counter()
+            landmark_lists = []
+            pre_processed_landmark_lists = []
+            for detection in packet.detections:
+                # Landmark calculation
+                landmark_list = calc_landmark_list(detection.landmarks,
+                                                   image_width, image_height)
+                landmark_lists.append(landmark_list)
+                # Conversion to relative coordinates / normalized coordinates
+                pre_processed_landmark_lists.append(
+                    pre_process_landmark(landmark_list))
+            self.metrics.record('landmarks', time.perf_counter() - start)
+
+            # Classify the hand signs of all hands in one interpreter call
+            start = time.perf_counter()
+            raw_hand_sign_ids, _ = self.keypoint_classifier.classify_batch(
+                np.stack(pre_processed_landmark_lists))
+            self.metrics.record('keypoint_classifier', time.perf_counter() - start)
+
+            pending = []
+            for index, detection in enumerate(packet.detections):
+                track_id = track_ids[index]
+                state = self.hand_states.get(track_id)
+                if state is None:
+                    state = HandState(self.history_length, self.sign_smoothing)
+                    self.hand_states[track_id] = state
+
+                landmark_list = landmark_lists[index]
+                raw_hand_sign_id = int(raw_hand_sign_ids[index])
+                hand_sign_id = state.sign_smoother.update(raw_hand_sign_id)
+                point = tracked_point(hand_sign_id, landmark_list)
+
+                needed = self.demand_graph.resolve({
+                    'preview': self.preview,
+                    'tracking': point != [0, 0],
+                    'spotlight_enabled': self._spotlight_enabled(),
+                    'logging_mode': mode if 0 <= number <= 9 else 0,
+                })
+
+                # Bounding box calculation
+                brect = None
+                if 'bounding_rect' in needed:
+                    brect = calc_bounding_rect(landmark_list)
+
+                pre_processed_point_history_list = None
+                if 'point_history_features' in needed:
+                    pre_processed_point_history_list = state.point_history.features(
+                        image_width, image_height)
+                # Write to the dataset file
+                if 'keypoint_logging' in needed or 'point_history_logging' in needed:
+                    logging_csv(number, mode, pre_processed_landmark_lists[index],
+                                pre_processed_point_history_list)
+
+                # Track index finger for swipe/move/spotlight gestures
+                state.point_history.append(point, packet.timestamp)
+
+                for name in self.demand_graph.nodes:
+                    if name not in needed:
+                        self.metrics.increment(f'skipped.{name}')
+                pending.append((track_id, state, needed, brect, hand_sign_id,
+                                raw_hand_sign_id, pre_processed_point_history_list))
+
+            # Classify finger gesture (for pinch) of every hand with a full
+            # history in one interpreter call
+            batch = [index for index, hand in enumerate(pending)
+                     if 'finger_gesture' in hand[2] and
+                     len(hand[6]) == (self.history_length * 2)]
+            raw_finger_gesture_ids = {}
+            if batch:
+                start = time.perf_counter()
+                ids, _ = self.point_history_classifier.classify_batch(
+                    np.stack([pending[index][6] for index in batch]))
+                self.metrics.record('point_history_classifier',
+                                    time.perf_counter() - start)
+                raw_finger_gesture_ids = dict(zip(batch, ids.tolist()))
+
+            for index, (track_id, state, needed, brect, hand_sign_id,
+                        raw_hand_sign_id, _) in enumerate(pending):
+                detection = packet.detections[index]
+
+                # Calculates the gesture IDs in the latest detection, -1 when skipped
+                raw_finger_gesture_id = -1
+                finger_gesture_id = 0
+                if 'finger_gesture' in needed:
+                    raw_finger_gesture_id = raw_finger_gesture_ids.get(index, 0)
+                    finger_gesture_id = state.finger_gesture_smoother.update(
+                        raw_finger_gesture_id)
+
+                packet.hands.append(HandResult(brect, landmark_lists[index],
+                                               detection.handedness,
+                                               hand_sign_id, finger_gesture_id,
+                                               track_id,
+                                               state.point_history.snapshot()))
+
+                if self.recorder is not None:
+                    recorded_hands.append((
+                        detection.landmarks,
+                        detection.handedness,
+                        detection.score,
+                        raw_hand_sign_id,
+                        raw_finger_gesture_id,
+                        track_id,
+                    ))
+
+        if self.recorder is not None:
+            self.recorder.write(packet.frame_id, packet.timestamp, recorded_hands,
+                                predicted=packet.predicted)
+        if self.scheduler is not None:
+            # Raw IDs, so a sign change triggers detection before the vote flips
+            self.scheduler.notify_gestures(raw_hand_sign_ids)
+
+        return packet
 
 #*************************************************************************************************************#
 
@@ -199,7 +344,23 @@ def get_args():
     parser.add_argument("--device", type=int, default=0)
     parser.add_argument("--width", help='cap width', type=int, default=960)
     parser.add_argument("--height", help='cap height', type=int, default=540)
-
+    parser.add_argument("--capture_buffer",
+                        help='number of frame slots in the capture ring buffer',
+                        type=int,
+                        default=3)
+    parser.add_argument("--queue_size",
+                        help='max frames waiting between pipeline stages',
+                        type=int,
+                        default=1)
+    parser.add_argument("--queue_policy",
+                        help='what a stage does when the next one is busy',
+                        choices=['drop_oldest', 'block'],
+                        default='drop_oldest')
+
+    parser.add_argument("--max_num_hands",
+                        help='number of hands to detect and track',
+                        type=int,
+                        default=1)
     parser.add_argument('--use_static_image_mode', action='store_true')
     parser.add_argument("--min_detection_confidence",
                         help='min_detection_confidence',
@@ -209,51 +370,150 @@ def get_args():
                         help='min_tracking_confidence',
                         type=int,
                         default=0.5)
+    parser.add_argument('--roi',
+                        help='only search for the hand around its last position '
+                             '(needs --use_static_image_mode)',
+                        action='store_true')
+    parser.add_argument("--roi_margin",
+                        help='ROI padding on each side, as a fraction of the hand size',
+                        type=float,
+                        default=0.5)
+    parser.add_argument("--detect_budget_ms",
+                        help='downscale the detector input when hands.process takes longer (0 = off)',
+                        type=float,
+                        default=0)
+    parser.add_argument("--detect_every",
+                        help='run hand detection at most every N frames while the hand is still (1 = every frame)',
+                        type=int,
+                        default=1)
+    parser.add_argument("--motion_threshold",
+                        help='landmark motion per frame (fraction of the image) that brings detection back to every frame',
+                        type=float,
+                        default=0.01)
+    parser.add_argument("--sign_smoothing",
+                        help='vote hand signs over this many frames before acting on them (1 = off)',
+                        type=int,
+                        default=5)
+    parser.add_argument("--classifier_backend",
+                        help='run the gesture classifiers with TensorFlow Lite or NumPy only',
+                        choices=['tflite', 'numpy'],
+                        default='tflite')
+    parser.add_argument("--classifier_precision",
+                        help='which exported TFLite variant of the classifiers to load',
+                        choices=['float32', 'float16', 'int8'],
+                        default='float32')
+    parser.add_argument("--spotlight_refresh",
+                        help='seconds between background screenshots for the spotlight (0 = capture on activation)',
+                        type=float,
+                        default=0.0)
+    parser.add_argument("--window_poll",
+                        help='seconds between background lookups of the foreground window (0 = look up on activation)',
+                        type=float,
+                        default=1.0)
+    parser.add_argument("--cursor_rate",
+                        help='cursor moves per second, interpolated between camera frames (0 = one move per frame)',
+                        type=float,
+                        default=0.0)
+    parser.add_argument("--record",
+                        help='append every frame\'s landmarks to this session file',
+                        default=None)
+    parser.add_argument("--metrics_file",
+                        help='periodically write stage latencies here (.json or Prometheus text)',
+                        default=None)
+    parser.add_argument("--metrics_interval",
+                        help='seconds between metrics file updates',
+                        type=float,
+                        default=5.0)
+    parser.add_argument('--metrics_overlay',
+                        help='draw stage latencies on the preview',
+                        action='store_true')
+    parser.add_argument('--headless',
+                        help='run without the preview window (stop with Ctrl+C)',
+                        action='store_true')
+    parser.add_argument('--startup_profile', '--startup-profile',
+                        help='print how long imports, model load, camera open and the first frame took',
+                        action='store_true')
 
     args = parser.parse_args()
+    if args.roi and not args.use_static_image_mode:
+        # Tracking mode already skips palm detection while it holds the hand
+        parser.error("--roi only helps with --use_static_image_mode")
 
     return args
 
+def load_models(args, image_width, image_height, profile):
+    """Import, build and warm up the hand detector and both classifiers.
+
+    Runs on a worker thread while the camera opens. The first inference of
+    each model is much slower than the rest, so it is run here on a blank
+    frame instead of on the first real one.
+    """
+    with profile.phase('import mediapipe'):
+        import mediapipe as mp
+
+    with profile.phase('load hands model'):
+        hands = mp.solutions.hands.Hands(
+            static_image_mode=args.use_static_image_mode,
+            max_num_hands=args.max_num_hands,
+            min_detection_confidence=args.min_detection_confidence,
+            min_tracking_confidence=args.min_tracking_confidence,
+        )
+    # Pretrained Classifiers (static+motion gestures) load ########################################################
+    with profile.phase('load classifiers'):
+        keypoint_classifier = KeyPointClassifier(
+            backend=args.classifier_backend,
+            precision=args.classifier_precision)
+        point_history_classifier = PointHistoryClassifier(
+            backend=args.classifier_backend,
+            precision=args.classifier_precision)
+
+    with profile.phase('warm up models'):
+        hands.process(np.zeros((image_height, image_width, 3), dtype=np.uint8))
+        keypoint_classifier(np.zeros(42, dtype=np.float32))
+        point_history_classifier(np.zeros(32, dtype=np.float32))
+
+    return hands, keypoint_classifier, point_history_classifier
+
 def main():
     # Argument parsing #################################################################
     args = get_args()
 
+    profile = StartupProfile(_IMPORT_START)
+    profile.add('imports', _IMPORT_START, _IMPORT_END - _IMPORT_START)
+
     cap_device = args.device
     cap_width = args.width
     cap_height = args.height
-
-    use_static_image_mode = args.use_static_image_mode
-    min_detection_confidence = args.min_detection_confidence
-    min_tracking_confidence = args.min_tracking_confidence
+    capture_buffer = args.capture_buffer
 
     use_brect = True
+    headless = args.headless
 
-    # Camera preparation ###############################################################
-    cap = cv.VideoCapture(cap_device)
-    # Set preferred dimensions
-    cap.set(cv.CAP_PROP_FRAME_WIDTH, cap_width)
-    cap.set(cv.CAP_PROP_FRAME_HEIGHT, cap_height)
-
-    # Get the actual dimensions (camera may not honor the requested size exactly)
-    actual_cam_width = int(cap.get(cv.CAP_PROP_FRAME_WIDTH))
-    actual_cam_height = int(cap.get(cv.CAP_PROP_FRAME_HEIGHT))
-    print("----")
-    print("🎥 Camera dimensions (actual):", actual_cam_width, "x", actual_cam_height)
-    print("----")
-
-
-    # Model load #############################################################
-    mp_hands = mp.solutions.hands
-    hands = mp_hands.Hands(
-        static_image_mode=use_static_image_mode,
-        max_num_hands=1,
-        min_detection_confidence=min_detection_confidence,
-        min_tracking_confidence=min_tracking_confidence,
-    )
-    # Pretrained Classifiers (static+motion gestures) load ########################################################
-    keypoint_classifier = KeyPointClassifier()
+    # Model load, in the background while the camera opens ###########################
+    model_loader = ThreadPoolExecutor(max_workers=1)
+    models = model_loader.submit(load_models, args, cap_width, cap_height, profile)
+    model_loader.shutdown(wait=False)
 
-    point_history_classifier = PointHistoryClassifier()
+    # Camera preparation ###############################################################
+    with profile.phase('open camera'):
+        cap = cv.VideoCapture(cap_device)
+        # Set preferred dimensions
+        cap.set(cv.CAP_PROP_FRAME_WIDTH, cap_width)
+        cap.set(cv.CAP_PROP_FRAME_HEIGHT, cap_height)
+
+        # Get the actual dimensions (camera may not honor the requested size exactly)
+        actual_cam_width = int(cap.get(cv.CAP_PROP_FRAME_WIDTH))
+        actual_cam_height = int(cap.get(cv.CAP_PROP_FRAME_HEIGHT))
+        print("----")
+        print("🎥 Camera dimensions (actual):", actual_cam_width, "x", actual_cam_height)
+        print("----")
+
+        # Frames are grabbed on their own thread so a slow iteration never
+        # leaves us processing a stale, buffered image
+        capture = FrameCapture(cap, buffer_len=capture_buffer).start()
+
+    with profile.phase('wait for models'):
+        hands, keypoint_classifier, point_history_classifier = models.result()
 
     # Read labels ###########################################################
     with open('model/keypoint_classifier/keypoint_classifier_label.csv',
@@ -270,116 +530,207 @@ def main():
             row[0] for row in point_history_classifier_labels
         ]
 
-    # FPS Measurement ########################################################
-    cvFpsCalc = CvFpsCalc(buffer_len=10)
+    # Latency / FPS Measurement ##############################################
+    metrics = StageMetrics(args.metrics_file, dump_interval=args.metrics_interval)
+    metrics_overlay = args.metrics_overlay
 
     # Coordinate history #################################################################
     history_length = 16
-    point_history = deque(maxlen=history_length)
-
-    # Finger gesture history ################################################
-    finger_gesture_history = deque(maxlen=history_length)
 
     #  ########################################################################
     mode = 0
 
     #*************************************************************************************************************#
-    # Add our controller
-    controller = PresentationController(actual_cam_width, actual_cam_height)
+    # Add our controller, one set of gesture state per tracked hand. Its
+    # keyboard/mouse/window actions run on the dispatcher's thread, so the
+    # frame loop never waits for the OS
+    actions = ActionDispatcher(metrics=metrics).start()
+    controller = MultiHandController(actual_cam_width, actual_cam_height, actions=actions,
+                                     cursor_rate=args.cursor_rate)
+    if args.spotlight_refresh > 0:
+        controller.spotlight_controller.start_background_refresh(args.spotlight_refresh)
+    if args.window_poll > 0:
+        controller.spotlight_controller.start_window_tracking(args.window_poll)
     #*************************************************************************************************************#
 
-    while True:
-        fps = cvFpsCalc.get()
-
-        # Process Key (ESC: end) #################################################
-        key = cv.waitKey(10)
-        if key == 27:  # ESC
-            break
-        number, mode = select_mode(key, mode)
+    recorder = None
+    if args.record:
+        recorder = SessionRecorder(args.record, actual_cam_width, actual_cam_height)
+
+    # Frame pipeline: capture -> detect -> classify run on worker threads,
+    # act + render stay on the main thread because the controllers and the
+    # preview both use HighGUI windows, which must live on the thread that
+    # pumps cv.waitKey
+    detector = HandDetector(
+        hands,
+        roi=args.roi,
+        roi_margin=args.roi_margin,
+        latency_budget=args.detect_budget_ms / 1000.0 if args.detect_budget_ms else None,
+    )
+    scheduler = None
+    if args.detect_every > 1:
+        scheduler = DetectionScheduler(max_interval=args.detect_every,
+                                       motion_threshold=args.motion_threshold)
+    processor = FrameProcessor(capture, detector, keypoint_classifier,
+                               point_history_classifier, history_length,
+                               recorder=recorder, metrics=metrics,
+                               scheduler=scheduler,
+                               sign_smoothing=args.sign_smoothing,
+                               preview=not headless,
+                               controller=controller)
+    pipeline = FramePipeline(processor.capture,
+                             queue_size=args.queue_size,
+                             policy=args.queue_policy,
+                             on_drop=processor.release)
+    pipeline.add_stage('detect', processor.detect)
+    pipeline.add_stage('classify', processor.classify)
+    pipeline.start()
+    pipeline_start = time.perf_counter()
+
+    # Shutdown: ESC in the preview window, Ctrl+C / SIGTERM in any mode
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
 
-        # Camera capture #####################################################
-        ret, image = cap.read()
-        if not ret:
+    number = -1
+    frame_count = 0
+    start_time = time.perf_counter()
+    last_report_time = start_time
+
+    while not stop_event.is_set():
+        if headless:
+            # No preview to pump, but an active spotlight overlay still needs
+            # HighGUI events to be processed
+            if controller.spotlight_controller.enabled:
+                cv.waitKey(1)
+        else:
+            # Process Key (ESC: end) #################################################
+            key = cv.waitKey(1)
+            if key == 27:  # ESC
+                break
+            number, mode = select_mode(key, mode)
+            processor.number, processor.mode = number, mode
+
+        # Wait for the next classified frame ##################################
+        try:
+            packet = pipeline.get(timeout=0.1 if headless else 0.01)
+        except queue.Empty:
+            continue
+        if packet is None:
             break
-        image = cv.flip(image, 1)  # Mirror display
-        debug_image = copy.deepcopy(image)
 
-        # Detection implementation #############################################################
-        image = cv.cvtColor(image, cv.COLOR_BGR2RGB)
+        fps = metrics.tick()
+        frame_count += 1
+        if frame_count == 1:
+            profile.add('first frame', pipeline_start,
+                        time.perf_counter() - pipeline_start)
+            if args.startup_profile:
+                print(profile.report())
+
+        controller.retain(packet.track_ids)
+        for hand in packet.hands:
+            #*************************************************************************************************************#
+            # Handle gestures, with the state of this hand's track
+            start = time.perf_counter()
+            controller.handle_gestures(
+                hand.track_id,
+                hand.hand_sign_id,
+                hand.finger_gesture_id,
+                hand.landmark_list,
+                hand.point_history
+            )
+            metrics.record('handle_gestures', time.perf_counter() - start)
+            #*************************************************************************************************************#
+
+        if headless:
+            metrics.record('end_to_end', time.time() - packet.timestamp)
+            metrics.maybe_dump()
+            processor.release(packet)
+            now = time.perf_counter()
+            if now - last_report_time >= 5.0:
+                print(f"FPS: {fps}, frame allocations: {processor.allocations}")
+                last_report_time = now
+            continue
+
+        # Drawing part
+        start = time.perf_counter()
+        debug_image = packet.image
+        for hand in packet.hands:
+            debug_image = draw_bounding_rect(use_brect, debug_image, hand.brect)
+            debug_image = draw_landmarks(debug_image, hand.landmark_list)
+            debug_image = draw_info_text(
+                debug_image,
+                hand.brect,
+                hand.handedness,
+                keypoint_classifier_labels[hand.hand_sign_id],
+                point_history_classifier_labels[hand.finger_gesture_id],
+            )
+            debug_image = draw_point_history(debug_image, hand.point_history)
 
-        image.flags.writeable = False
-        results = hands.process(image)
-        image.flags.writeable = True
-
-        # Hand Landmark Processing ####################################################################
-        if results.multi_hand_landmarks is not None:
-            for hand_landmarks, handedness in zip(results.multi_hand_landmarks,
-                                                  results.multi_handedness):
-                # Bounding box calculation
-                brect = calc_bounding_rect(debug_image, hand_landmarks)
-                # Landmark calculation
-                landmark_list = calc_landmark_list(debug_image, hand_landmarks)
-
-                # Conversion to relative coordinates / normalized coordinates
-                pre_processed_landmark_list = pre_process_landmark(
-                    landmark_list)
-                pre_processed_point_history_list = pre_process_point_history(
-                    debug_image, point_history)
-                # Write to the dataset file
-                logging_csv(number, mode, pre_processed_landmark_list,
-                            pre_processed_point_history_list)
-                #*************************************************************************************************************#
-                # Classify hand sign
-                hand_sign_id = keypoint_classifier(pre_processed_landmark_list)
-                
-                # Track index finger for swipe/move/spotlight gestures
-                if hand_sign_id in [THREE_FINGER_ID, TWO_FINGER_ID, POINTING_ID]:
-                    point_history.append(landmark_list[8])
-                else:
-                    point_history.append([0, 0])
-                
-                # Classify finger gesture (for pinch)
-                finger_gesture_id = 0
-                if len(pre_processed_point_history_list) == (history_length * 2):
-                    finger_gesture_id = point_history_classifier(
-                        pre_processed_point_history_list)
-                
-                # Handle gestures
-                controller.handle_gestures(
-                    hand_sign_id, 
-                    finger_gesture_id,
-                    landmark_list,
-                    point_history
-                )
-                #*************************************************************************************************************#
-
-                # Calculates the gesture IDs in the latest detection
-                finger_gesture_history.append(finger_gesture_id)
-                most_common_fg_id = Counter(
-                    finger_gesture_history).most_common()
-                    
-                # Drawing part
-                debug_image = draw_bounding_rect(use_brect, debug_image, brect)
-                debug_image = draw_landmarks(debug_image, landmark_list)
-                debug_image = draw_info_text(
-                    debug_image,
-                    brect,
-                    handedness,
-                    keypoint_classifier_labels[hand_sign_id],
-                    point_history_classifier_labels[most_common_fg_id[0][0]],
-                )
-        else:
-            point_history.append([0, 0])
-
-        debug_image = draw_point_history(debug_image, point_history)
         debug_image = draw_info(debug_image, fps, mode, number)
+        if metrics_overlay:
+            debug_image = draw_stage_metrics(debug_image, metrics.snapshot())
+        metrics.record('draw', time.perf_counter() - start)
 
         # Screen reflection #############################################################
+        start = time.perf_counter()
         cv.imshow('Hand Gesture Recognition', debug_image)
-
-    cap.release()
+        metrics.record('imshow', time.perf_counter() - start)
+        metrics.record('end_to_end', time.time() - packet.timestamp)
+        metrics.maybe_dump()
+        processor.release(packet)
+
+    elapsed = time.perf_counter() - start_time
+    pipeline.stop()
+    capture.release()
+    # Everything that still queues actions stops before the dispatcher
+    if controller.cursor_interpolator is not None:
+        controller.cursor_interpolator.stop()
+        print("Cursor:", controller.cursor_interpolator.stats())
+    controller.spotlight_controller.window_tracker.stop()
+    refresher = controller.spotlight_controller.refresher
+    if refresher is not None:
+        refresher.stop()
+        print("Spotlight screenshots:", refresher.stats())
+    actions.stop()
+    if recorder is not None:
+        recorder.close()
+        print(f"Recorded {recorder.records_written} records to {args.record}")
     cv.destroyAllWindows()
 
+    stats = capture.stats()
+    print(f"Frames captured: {stats['captured']}, processed: {stats['delivered']}, "
+          f"dropped: {stats['dropped']}")
+    # Compare against a run without --headless to see the rendering cost
+    if frame_count and elapsed > 0:
+        print(f"Average FPS ({'headless' if headless else 'preview'}): "
+              f"{frame_count / elapsed:.2f} over {frame_count} frames")
+    print(f"Frame buffer allocations: {processor.allocations}")
+    print("Hand detection:", detector.stats())
+    print("Actions:", actions.stats())
+    if scheduler is not None:
+        scheduler_stats = scheduler.stats()
+        detect_stats = metrics.snapshot().get('hands.process')
+        saved = ''
+        if detect_stats:
+            saved = (f", ~{scheduler_stats['predicted_frames'] * detect_stats['mean'] / 1000.0:.1f} s "
+                     f"of detector CPU time saved")
+        print(f"Detection cadence: {scheduler_stats}{saved}")
+    for name, stage in pipeline.stats().items():
+        print(f"  {name}: {stage['processed']} frames, {stage['avg_ms']:.1f} ms avg, "
+              f"{stage['dropped']} dropped downstream")
+    skipped = {name: node['skipped']
+               for name, node in processor.demand_graph.stats().items() if node['skipped']}
+    if skipped:
+        print("Skipped (not needed for the frame):", skipped)
+
+    print("Stage latency (ms):")
+    for name, stage in metrics.snapshot().items():
+        print(f"  {name:<26} p50 {stage['p50']:7.2f}  p95 {stage['p95']:7.2f}  "
+              f"p99 {stage['p99']:7.2f}  max {stage['max']:7.2f}")
+    if args.metrics_file:
+        metrics.dump()
+
 
 def select_mode(key, mode):
     number = -1
@@ -394,90 +745,6 @@ def select_mode(key, mode):
     return number, mode
 
 
-def calc_bounding_rect(image, landmarks):
-    image_width, image_height = image.shape[1], image.shape[0]
-
-    landmark_array = np.empty((0, 2), int)
-
-    for _, landmark in enumerate(landmarks.landmark):
-        landmark_x = min(int(landmark.x * image_width), image_width - 1)
-        landmark_y = min(int(landmark.y * image_height), image_height - 1)
-
-        landmark_point = [np.array((landmark_x, landmark_y))]
-
-        landmark_array = np.append(landmark_array, landmark_point, axis=0)
-
-    x, y, w, h = cv.boundingRect(landmark_array)
-
-    return [x, y, x + w, y + h]
-
-
-def calc_landmark_list(image, landmarks):
-    image_width, image_height = image.shape[1], image.shape[0]
-
-    landmark_point = []
-
-    # Keypoint
-    for _, landmark in enumerate(landmarks.landmark):
-        landmark_x = min(int(landmark.x * image_width), image_width - 1)
-        landmark_y = min(int(landmark.y * image_height), image_height - 1)
-        # landmark_z = landmark.z
-
-        landmark_point.append([landmark_x, landmark_y])
-
-    return landmark_point
-
-
-def pre_process_landmark(landmark_list):
-    temp_landmark_list = copy.deepcopy(landmark_list)
-
-    # Convert to relative coordinates
-    base_x, base_y = 0, 0
-    for index, landmark_point in enumerate(temp_landmark_list):
-        if index == 0:
-            base_x, base_y = landmark_point[0], landmark_point[1]
-
-        temp_landmark_list[index][0] = temp_landmark_list[index][0] - base_x
-        temp_landmark_list[index][1] = temp_landmark_list[index][1] - base_y
-
-    # Convert to a one-dimensional list
-    temp_landmark_list = list(
-        itertools.chain.from_iterable(temp_landmark_list))
-
-    # Normalization
-    max_value = max(list(map(abs, temp_landmark_list)))
-
-    def normalize_(n):
-        return n / max_value
-
-    temp_landmark_list = list(map(normalize_, temp_landmark_list))
-
-    return temp_landmark_list
-
-
-def pre_process_point_history(image, point_history):
-    image_width, image_height = image.shape[1], image.shape[0]
-
-    temp_point_history = copy.deepcopy(point_history)
-
-    # Convert to relative coordinates
-    base_x, base_y = 0, 0
-    for index, point in enumerate(temp_point_history):
-        if index == 0:
-            base_x, base_y = point[0], point[1]
-
-        temp_point_history[index][0] = (temp_point_history[index][0] -
-                                        base_x) / image_width
-        temp_point_history[index][1] = (temp_point_history[index][1] -
-                                        base_y) / image_height
-
-    # Convert to a one-dimensional list
-    temp_point_history = list(
-        itertools.chain.from_iterable(temp_point_history))
-
-    return temp_point_history
-
-
 def logging_csv(number, mode, landmark_list, point_history_list):
     if mode == 0:
         pass
@@ -495,6 +762,10 @@ def logging_csv(number, mode, landmark_list, point_history_list):
 
 
 def draw_landmarks(image, landmark_point):
+    # OpenCV wants plain ints for point coordinates
+    if isinstance(landmark_point, np.ndarray):
+        landmark_point = landmark_point.tolist()
+
     if len(landmark_point) > 0:
         # Thumb
         cv.line(image, tuple(landmark_point[2]), tuple(landmark_point[3]),
@@ -696,7 +967,7 @@ def draw_info_text(image, brect, handedness, hand_sign_text,
     cv.rectangle(image, (brect[0], brect[1]), (brect[2], brect[1] - 22),
                  (0, 0, 0), -1)
 
-    info_text = handedness.classification[0].label[0:]
+    info_text = handedness
     if hand_sign_text != "":
         info_text = info_text + ':' + hand_sign_text
     cv.putText(image, info_text, (brect[0] + 5, brect[1] - 4),
@@ -715,12 +986,26 @@ def draw_info_text(image, brect, handedness, hand_sign_text,
 def draw_point_history(image, point_history):
     for index, point in enumerate(point_history):
         if point[0] != 0 and point[1] != 0:
-            cv.circle(image, (point[0], point[1]), 1 + int(index / 2),
+            cv.circle(image, (int(point[0]), int(point[1])), 1 + int(index / 2),
                       (152, 251, 152), 2)
 
     return image
 
 
+def draw_stage_metrics(image, snapshot):
+    # Bottom-left corner, one line per stage
+    y = image.shape[0] - 10 - 18 * len(snapshot)
+    for name, stage in snapshot.items():
+        text = "{}: p50 {:.1f} p95 {:.1f} p99 {:.1f} max {:.1f} ms".format(
+            name, stage['p50'], stage['p95'], stage['p99'], stage['max'])
+        cv.putText(image, text, (10, y), cv.FONT_HERSHEY_SIMPLEX, 0.45,
+                   (0, 0, 0), 3, cv.LINE_AA)
+        cv.putText(image, text, (10, y), cv.FONT_HERSHEY_SIMPLEX, 0.45,
+                   (255, 255, 255), 1, cv.LINE_AA)
+        y += 18
+    return image
+
+
 def draw_info(image, fps, mode, number):
     cv.putText(image, "FPS:" + str(fps), (10, 30), cv.FONT_HERSHEY_SIMPLEX,
                1.0, (0, 0, 0), 4, cv.LINE_AA)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compare the TFLite and NumPy classifier backends.
+
+Run from the repository root after `python -m model.export_npz`:
+    python -m benchmarks.classifier_backends            # parity, latency, memory
+    python -m benchmarks.classifier_backends --check    # exit 1 on any argmax mismatch
+
+Parity is checked on the recorded point history dataset (and keypoint.csv if
+it exists) plus random feature vectors. Peak RSS and startup time are measured
+in a fresh interpreter per backend, so one backend's imports do not count
+against the other.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from benchmarks.harness import measure
+
+DATASETS = {
+    'keypoint': 'model/keypoint_classifier/keypoint.csv',
+    'point_history': 'model/point_history_classifier/point_history.csv',
+}
+NUM_FEATURES = {'keypoint': 42, 'point_history': 32}
+BACKENDS = ('tflite', 'numpy')
+
+_FOOTPRINT_SCRIPT = '''
+import json, resource, sys, time
+start = time.perf_counter()
+from model import KeyPointClassifier, PointHistoryClassifier
+keypoint_classifier = KeyPointClassifier(backend=sys.argv[1])
+point_history_classifier = PointHistoryClassifier(backend=sys.argv[1])
+keypoint_classifier([0.0] * 42)
+point_history_classifier([0.0] * 32)
+print(json.dumps({"startup_s": time.perf_counter() - start,
+                  "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+'''
+
+
+def build_classifier(name, backend):
+    from model import KeyPointClassifier, PointHistoryClassifier
+    if name == 'keypoint':
+        return KeyPointClassifier(backend=backend)
+    return PointHistoryClassifier(backend=backend)
+
+
+def load_features(name, num_random=1000):
+    rng = np.random.default_rng(0)
+    features = [rng.uniform(-1.0, 1.0, size=(num_random, NUM_FEATURES[name]))]
+    path = DATASETS[name]
+    if os.path.exists(path):
+        rows = np.loadtxt(path, delimiter=',', dtype=np.float32, ndmin=2)
+        features.append(rows[:, 1:])  # first column is the label
+    return np.concatenate(features).astype(np.float32)
+
+
+def compare_scores(name, classifiers, features):
+    scores = {}
+    for backend, classifier in classifiers.items():
+        # Run row by row through _invoke so the tflite side is unbatched
+        scores[backend] = np.concatenate(
+            [classifier._invoke(row.reshape(1, -1)).copy() for row in features])
+    reference, candidate = scores['tflite'], scores['numpy']
+    mismatches = int((reference.argmax(axis=1) != candidate.argmax(axis=1)).sum())
+    max_diff = float(np.abs(reference - candidate).max())
+    print(f'{name}: {len(features)} rows, argmax mismatches {mismatches}, '
+          f'max |score diff| {max_diff:.2e}')
+    return mismatches
+
+
+def footprint(backend):
+    result = subprocess.run([sys.executable, '-c', _FOOTPRINT_SCRIPT, backend],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--check", help='fail if the backends disagree on any argmax',
+                        action='store_true')
+
+    args = parser.parse_args()
+
+    return args
+
+
+def main():
+    args = get_args()
+
+    available = {}
+    for backend in BACKENDS:
+        try:
+            for name in DATASETS:
+                available.setdefault(backend, {})[name] = build_classifier(name, backend)
+        except (ImportError, OSError, ValueError) as e:
+            print(f'Skipping {backend} backend: {e}')
+            available.pop(backend, None)
+
+    mismatches = 0
+    if len(available) == len(BACKENDS):
+        print('Parity')
+        for name in DATASETS:
+            classifiers = {backend: available[backend][name] for backend in BACKENDS}
+            mismatches += compare_scores(name, classifiers, load_features(name))
+    elif args.check:
+        print('Parity needs both backends')
+        sys.exit(1)
+
+    print('\nLatency (single vector)')
+    for backend, classifiers in available.items():
+        for name, classifier in classifiers.items():
+            vector = load_features(name, num_random=1)[0]
+            ns_per_op, _ = measure(lambda: classifier(vector))
+            print(f'  {backend:7} {name:14} {ns_per_op / 1000:8.1f} us')
+
+    print('\nStartup and peak RSS (fresh process, both classifiers)')
+    for backend in available:
+        result = footprint(backend)
+        if result is None:
+            print(f'  {backend:7} failed')
+            continue
+        print(f'  {backend:7} startup {result["startup_s"]:6.2f} s   '
+              f'max RSS {result["max_rss_mb"]:7.1f} MB')
+
+    if args.check and mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
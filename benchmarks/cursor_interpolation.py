@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Cursor smoothness: one move per camera frame vs the interpolator thread.
+
+Run from the repository root:
+    python -m benchmarks.cursor_interpolation [--rate 120] [--fps 30]
+
+A finger drags back and forth and then stops, sampled at the camera rate
+on a virtual clock. Both MoveController modes get the same samples; the
+interpolator is ticked at its output rate instead of running its thread,
+so the results are deterministic. Reported: moves per second while the
+finger moves, the largest single cursor jump and the prediction overshoot
+(camera px).
+"""
+import argparse
+import math
+
+from scripts.actions import RecordingActions
+from scripts.cursor_interpolator import CursorInterpolator
+from scripts.move_control import MoveController
+from utils.clock import VirtualClock
+
+
+def finger_path(fps, duration=2.0, still=0.5):
+    """(timestamp, (x, y)) samples: a sweeping drag, then holding still"""
+    samples = []
+    for index in range(int((duration + still) * fps)):
+        t = index / fps
+        phase = min(t, duration) / duration * 2 * math.pi
+        samples.append((t, (480 + 300 * math.sin(phase), 270 + 80 * math.sin(2 * phase))))
+    return samples
+
+
+def summarize(events, duration):
+    moves = [args for _, action, args in events if action == 'move_rel']
+    largest = max((math.hypot(dx, dy) for dx, dy in moves), default=0.0)
+    return {'moves_per_s': len(moves) / duration, 'largest_jump_px': largest}
+
+
+def run_per_frame(samples):
+    clock = VirtualClock()
+    actions = RecordingActions(clock=clock)
+    controller = MoveController(actions, clock)
+    for timestamp, point in samples:
+        clock.advance_to(timestamp)
+        controller.move_cursor(point)
+    return actions.events
+
+
+def run_interpolated(samples, rate):
+    clock = VirtualClock()
+    actions = RecordingActions(clock=clock)
+    interpolator = CursorInterpolator(actions, rate=rate, clock=clock)
+    controller = MoveController(actions, clock, interpolator=interpolator)
+
+    end = samples[-1][0]
+    tick = 0
+    index = 0
+    while tick / rate <= end:
+        now = tick / rate
+        while index < len(samples) and samples[index][0] <= now:
+            clock.advance_to(samples[index][0])
+            controller.move_cursor(samples[index][1])
+            index += 1
+        clock.advance_to(now)
+        interpolator.tick(now)
+        tick += 1
+    return actions.events, interpolator.stats()
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--rate", help='interpolator output rate (Hz)', type=float, default=120.0)
+    parser.add_argument("--fps", help='camera frame rate', type=float, default=30.0)
+
+    args = parser.parse_args()
+
+    return args
+
+
+def main():
+    args = get_args()
+    samples = finger_path(args.fps)
+    moving = 2.0
+
+    per_frame = summarize(run_per_frame(samples), moving)
+    events, stats = run_interpolated(samples, args.rate)
+    interpolated = summarize(events, moving)
+
+    print(f"{'mode':<14} {'moves/s':>8} {'largest jump px':>16}")
+    for name, result in (('per frame', per_frame), (f'{args.rate:g} Hz', interpolated)):
+        print(f"{name:<14} {result['moves_per_s']:8.1f} {result['largest_jump_px']:16.1f}")
+    print(f"Interpolator: {stats}")
+
+
+if __name__ == '__main__':
+    main()
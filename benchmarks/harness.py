@@ -0,0 +1,79 @@
+import json
+import os
+import time
+import tracemalloc
+
+
+def measure(func, min_time=0.2, repeat=5):
+    """Time func() and measure what one call allocates.
+
+    Returns (ns per call, peak bytes allocated by a single call). The
+    timing is the best of `repeat` runs, each long enough to last
+    min_time seconds.
+    """
+    func()  # Warm up caches / lazy initialization
+
+    number = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= min_time * 1e9:
+            break
+        number *= 2
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter_ns() - start)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best / number, max(peak - baseline, 0)
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baselines(path, results):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def check_regressions(results, baselines, tolerance=0.25):
+    """Names of benchmarks slower or allocating more than their baseline"""
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        if result['ns_per_op'] > baseline['ns_per_op'] * (1 + tolerance):
+            regressions.append(name)
+        elif result['alloc_bytes'] > baseline['alloc_bytes'] * (1 + tolerance) + 64:
+            regressions.append(name)
+    return regressions
+
+
+def print_results(results, baselines=None):
+    baselines = baselines or {}
+    print(f"{'benchmark':<40} {'ns/op':>12} {'alloc B/op':>12} {'vs baseline':>12}")
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        change = ''
+        if baseline:
+            change = f"{(result['ns_per_op'] / baseline['ns_per_op'] - 1) * 100:+.1f}%"
+        print(f"{name:<40} {result['ns_per_op']:>12.0f} "
+              f"{result['alloc_bytes']:>12} {change:>12}")
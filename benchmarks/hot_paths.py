@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Micro-benchmarks for the functions that run on every camera frame.
+
+Run from the repository root:
+    python -m benchmarks.hot_paths               # print ns/op and allocations
+    python -m benchmarks.hot_paths --save        # store results as the baseline
+    python -m benchmarks.hot_paths --check       # exit 1 on a regression
+
+Baselines are machine specific, so they are not committed. --check on a
+machine without one (a fresh checkout, a CI runner) records the run as
+the baseline and passes; later runs are compared against it.
+"""
+import argparse
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+from benchmarks.harness import (check_regressions, load_baselines, measure,
+                                print_results, save_baselines)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'hot_paths_baseline.json')
+
+IMAGE_WIDTH, IMAGE_HEIGHT = 960, 540
+HISTORY_LENGTH = 16
+
+
+def synthetic_hand_landmarks(seed=0):
+    """Object shaped like MediaPipe's NormalizedLandmarkList"""
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0.3, 0.7, size=(21, 3))
+    return SimpleNamespace(landmark=[
+        SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in points
+    ])
+
+
+def synthetic_swipe_history():
+    """Index finger moving right across the frame, then stopping"""
+    from utils.point_history import PointHistory
+
+    history = PointHistory(HISTORY_LENGTH)
+    points = [[0, 0]] * 4
+    points += [[200 + i * 45, 300 + i] for i in range(8)]
+    points += [[560, 308]] * 4
+    for index, point in enumerate(points):
+        history.append(point, index / 30.0)
+    return history
+
+
+def build_benchmarks():
+    from scripts.actions import RecordingActions
+    from scripts.presentation_control import PresentationController
+    from scripts.swipe_control import detect_swipe
+    from utils.landmarks import (calc_bounding_rect, calc_landmark_list,
+                                 landmark_array, pre_process_landmark)
+
+    hand_landmarks = synthetic_hand_landmarks()
+    landmarks = landmark_array(hand_landmarks)
+    landmark_list = calc_landmark_list(landmarks, IMAGE_WIDTH, IMAGE_HEIGHT)
+    pre_processed_landmark_list = pre_process_landmark(landmark_list)
+    history = synthetic_swipe_history()
+    scratch_history = synthetic_swipe_history()
+    point_history = history.points()
+    pre_processed_point_history = history.features(IMAGE_WIDTH, IMAGE_HEIGHT).copy()
+
+    benchmarks = {
+        'landmark_array': lambda: landmark_array(hand_landmarks),
+        'calc_bounding_rect': lambda: calc_bounding_rect(landmark_list),
+        'calc_landmark_list':
+            lambda: calc_landmark_list(landmarks, IMAGE_WIDTH, IMAGE_HEIGHT),
+        'pre_process_landmark': lambda: pre_process_landmark(landmark_list),
+        'PointHistory.append': lambda: scratch_history.append([560, 308], 0.5),
+        'PointHistory.features':
+            lambda: history.features(IMAGE_WIDTH, IMAGE_HEIGHT),
+        'detect_swipe': lambda: detect_swipe(point_history),
+    }
+
+    actions = RecordingActions(screen_size=(1920, 1080))
+    controller = PresentationController(IMAGE_WIDTH, IMAGE_HEIGHT, actions=actions)
+    benchmarks['_swipe_ended'] = lambda: controller._swipe_ended(point_history)
+
+    spotlight = controller.spotlight_controller
+    rng = np.random.default_rng(0)
+    screenshot = rng.integers(0, 256, size=(1080, 1920, 3), dtype=np.uint8)
+    spotlight.screenshot = screenshot
+    spotlight.renderer.set_screenshot(screenshot)
+    # Alternate between two positions so every call moves the spotlight
+    positions = [(900, 500), (960, 540)]
+
+    def show_spotlight():
+        positions.reverse()
+        spotlight.show_spotlight(positions[0])
+        actions.events.clear()
+
+    benchmarks['show_spotlight_1080p'] = show_spotlight
+
+    from model import KeyPointClassifier, PointHistoryClassifier
+    numpy_keypoint_classifier = KeyPointClassifier(backend='numpy')
+    numpy_point_history_classifier = PointHistoryClassifier(backend='numpy')
+    benchmarks['KeyPointClassifier[numpy].__call__'] = \
+        lambda: numpy_keypoint_classifier(pre_processed_landmark_list)
+    benchmarks['PointHistoryClassifier[numpy].__call__'] = \
+        lambda: numpy_point_history_classifier(pre_processed_point_history)
+
+    try:
+        keypoint_classifier = KeyPointClassifier()
+        point_history_classifier = PointHistoryClassifier()
+    except ImportError as e:
+        print(f"Skipping TFLite classifier benchmarks: {e}")
+    else:
+        benchmarks['KeyPointClassifier.__call__'] = \
+            lambda: keypoint_classifier(pre_processed_landmark_list)
+        benchmarks['PointHistoryClassifier.__call__'] = \
+            lambda: point_history_classifier(pre_processed_point_history)
+        two_hands = np.stack([pre_processed_landmark_list] * 2)
+        benchmarks['KeyPointClassifier.classify_batch(2)'] = \
+            lambda: keypoint_classifier.classify_batch(two_hands)
+
+    return benchmarks
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--save", help='store the results as the new baseline',
+                        action='store_true')
+    parser.add_argument("--check", help='fail if slower than the baseline',
+                        action='store_true')
+    parser.add_argument("--tolerance",
+                        help='allowed slowdown before --check fails (0.25 = 25%%)',
+                        type=float,
+                        default=0.25)
+    parser.add_argument("--filter", help='only run benchmarks containing this',
+                        default='')
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+
+    args = parser.parse_args()
+
+    return args
+
+
+def main():
+    args = get_args()
+
+    results = {}
+    for name, func in build_benchmarks().items():
+        if args.filter not in name:
+            continue
+        ns_per_op, alloc_bytes = measure(func)
+        results[name] = {'ns_per_op': ns_per_op, 'alloc_bytes': alloc_bytes}
+
+    baselines = load_baselines(args.baseline)
+    print_results(results, baselines)
+
+    if args.save:
+        baselines.update(results)
+        save_baselines(args.baseline, baselines)
+        print(f"Baseline saved to {args.baseline}")
+
+    if args.check:
+        missing = {name: result for name, result in results.items()
+                   if name not in baselines}
+        if missing:
+            # First run on this machine, or new benchmarks: nothing to compare yet
+            baselines.update(missing)
+            save_baselines(args.baseline, baselines)
+            print(f"No baseline for {len(missing)} benchmark(s), recorded this run "
+                  f"to {args.baseline}")
+        regressions = check_regressions(results, baselines, args.tolerance)
+        if regressions:
+            print("Regressions:", ", ".join(regressions))
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Accuracy vs latency vs size for the float32/float16/int8 classifiers.
+
+Run from the repository root after `python -m model.export_quantized`:
+    python -m benchmarks.quantization_report
+
+Accuracy is measured on the held-out split the training notebooks use;
+variants or datasets that are missing are skipped.
+"""
+import os
+
+import numpy as np
+
+from benchmarks.harness import measure
+from model.export_quantized import CLASSIFIERS, load_dataset, train_test_split
+from model.tflite_loader import PRECISIONS, variant_path
+
+
+def build_classifier(name, precision):
+    from model import KeyPointClassifier, PointHistoryClassifier
+    if name == 'keypoint':
+        return KeyPointClassifier(precision=precision)
+    # score_th=0 so accuracy compares raw arg-max predictions
+    return PointHistoryClassifier(precision=precision, score_th=0.0)
+
+
+def main():
+    print(f'{"classifier":<14} {"precision":<9} {"accuracy":>9} {"us/call":>8} {"bytes":>7}')
+    for name, config in sorted(CLASSIFIERS.items()):
+        test_features = test_labels = None
+        if os.path.exists(config['dataset']):
+            features, labels = load_dataset(config['dataset'])
+            _, test_features, _, test_labels = train_test_split(features, labels)
+
+        for precision in PRECISIONS:
+            path = variant_path(config['tflite'], precision)
+            if not os.path.exists(path):
+                print(f'{name:<14} {precision:<9} missing, run python -m model.export_quantized')
+                continue
+            try:
+                classifier = build_classifier(name, precision)
+            except ImportError as e:
+                print(f'No TFLite runtime available: {e}')
+                return
+
+            accuracy = '-'
+            if test_features is not None:
+                ids, _ = classifier.classify_batch(test_features)
+                accuracy = f'{100.0 * np.mean(ids == test_labels):.2f}%'
+            vector = np.zeros(classifier.input_details[0]['shape'][-1], dtype=np.float32)
+            ns_per_op, _ = measure(lambda: classifier(vector))
+            print(f'{name:<14} {precision:<9} {accuracy:>9} {ns_per_op / 1000:8.1f} '
+                  f'{os.path.getsize(path):7d}')
+
+
+if __name__ == '__main__':
+    main()
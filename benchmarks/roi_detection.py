@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Hand detection cost with and without --roi, on real frames.
+
+Run from the repository root with a clip of someone gesturing:
+    python -m benchmarks.roi_detection clip.mp4 [--max_num_hands 1]
+
+Every frame goes through HandDetector in three setups: the default
+tracking-mode Hands instance on the full frame, a static_image_mode
+instance on the full frame, and a static_image_mode instance with roi=True.
+Reported per setup: ms per frame (mean and p95) and the share of frames a
+hand was found in. --roi is only offered with --use_static_image_mode, so
+the last two rows are the comparison that matters; the first shows what
+the tracking path costs without it.
+"""
+import argparse
+import time
+
+import cv2 as cv
+import numpy as np
+
+from utils.hand_detector import HandDetector
+
+SETUPS = (
+    ('tracking', False, False),
+    ('static', True, False),
+    ('static + roi', True, True),
+)
+
+
+def read_frames(path, limit):
+    """RGB frames of the clip, mirrored like app.py does"""
+    cap = cv.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ok, image = cap.read()
+        if not ok:
+            break
+        frames.append(cv.cvtColor(cv.flip(image, 1), cv.COLOR_BGR2RGB))
+    cap.release()
+    return frames
+
+
+def run(frames, static_image_mode, roi, max_num_hands):
+    import mediapipe as mp
+
+    hands = mp.solutions.hands.Hands(static_image_mode=static_image_mode,
+                                     max_num_hands=max_num_hands,
+                                     min_detection_confidence=0.7,
+                                     min_tracking_confidence=0.5)
+    detector = HandDetector(hands, roi=roi)
+    detector.process(frames[0])  # Warm up
+
+    timings = []
+    found = 0
+    for frame in frames:
+        start = time.perf_counter()
+        detected = detector.process(frame)
+        timings.append(time.perf_counter() - start)
+        found += bool(detected)
+    hands.close()
+    return np.array(timings) * 1000, found / len(frames), detector.stats()
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("video", help='clip to read the frames from')
+    parser.add_argument("--max_num_hands", type=int, default=1)
+    parser.add_argument("--frames", help='use at most this many frames',
+                        type=int, default=600)
+
+    args = parser.parse_args()
+
+    return args
+
+
+def main():
+    args = get_args()
+    frames = read_frames(args.video, args.frames)
+    if not frames:
+        print(f"No frames in {args.video}")
+        return
+    height, width = frames[0].shape[:2]
+    print(f"{len(frames)} frames at {width}x{height}")
+
+    print(f"{'setup':<14} {'mean ms':>8} {'p95 ms':>8} {'found':>7}")
+    for name, static_image_mode, roi in SETUPS:
+        timings, found, stats = run(frames, static_image_mode, roi,
+                                    args.max_num_hands)
+        print(f"{name:<14} {timings.mean():8.2f} {np.percentile(timings, 95):8.2f} "
+              f"{found:7.0%}  {stats if roi else ''}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Per-frame cost of drawing the spotlight at 1080p and 4K.
+
+Run from the repository root:
+    python -m benchmarks.spotlight_render
+
+Compares SpotlightRenderer, which patches only the spotlight area, with
+the previous full-screen dim-and-mask on every frame, and checks that both
+produce the same image. The spotlight follows a moving finger, so every
+frame both restores the old circle and draws the new one.
+"""
+import cv2
+import numpy as np
+
+from benchmarks.harness import measure
+from scripts.spotlight_renderer import SpotlightRenderer
+
+RESOLUTIONS = {'1080p': (1920, 1080), '4K': (3840, 2160)}
+RADIUS = 200
+ALPHA = 0.3
+
+
+def full_frame_render(screenshot, finger_pos, radius):
+    """Reference: dim and mask the whole screen, as show_spotlight used to"""
+    base = screenshot.copy()
+    h, w, _ = base.shape
+    dark_overlay = base.copy()
+    dark_overlay[:] = (0, 0, 0)
+    mask = np.zeros((h, w), dtype=np.uint8)
+    cv2.circle(mask, finger_pos, radius, 255, -1)
+    mask_3d = cv2.merge([mask] * 3)
+    inv_mask = cv2.bitwise_not(mask_3d)
+    darkened = cv2.addWeighted(base, ALPHA, dark_overlay, 1 - ALPHA, 0)
+    spotlight = cv2.bitwise_and(base, mask_3d)
+    dimmed = cv2.bitwise_and(darkened, inv_mask)
+    return cv2.add(spotlight, dimmed)
+
+
+def finger_path(width, height, steps=64):
+    """Positions along a sweep across the screen, partly off its edges"""
+    xs = np.linspace(-RADIUS // 2, width + RADIUS // 2, steps).astype(int)
+    ys = (height / 2 + height / 3 * np.sin(np.linspace(0, 2 * np.pi, steps))).astype(int)
+    return [(int(x), int(y)) for x, y in zip(xs, ys)]
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'resolution':<10} {'full frame ms':>14} {'incremental ms':>15} {'speedup':>8}")
+    for name, (width, height) in RESOLUTIONS.items():
+        screenshot = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        path = finger_path(width, height)
+
+        renderer = SpotlightRenderer(alpha=ALPHA)
+        renderer.set_screenshot(screenshot)
+        for position in path:
+            expected = full_frame_render(screenshot, position, RADIUS)
+            if not np.array_equal(renderer.render(position, RADIUS), expected):
+                raise SystemExit(f"{name}: output differs at {position}")
+
+        step = iter(range(1 << 62))
+
+        def incremental():
+            renderer.render(path[next(step) % len(path)], RADIUS)
+
+        def full_frame():
+            full_frame_render(screenshot, path[next(step) % len(path)], RADIUS)
+
+        incremental_ns, _ = measure(incremental)
+        full_frame_ns, _ = measure(full_frame)
+        set_screenshot_ns, _ = measure(lambda: renderer.set_screenshot(screenshot),
+                                       repeat=2)
+        print(f"{name:<10} {full_frame_ns / 1e6:14.2f} {incremental_ns / 1e6:15.3f} "
+              f"{full_frame_ns / incremental_ns:7.0f}x")
+        print(f"{'':<10} new screenshot (dim once): {set_screenshot_ns / 1e6:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
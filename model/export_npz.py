@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Export the gesture classifiers' weights to .npz for the NumPy backend.
+
+Run from the repository root:
+    python -m model.export_npz                       # both bundled models
+    python -m model.export_npz path/to/model.tflite  # one model, next to it
+
+.tflite files are read directly (no TensorFlow needed), .keras/.hdf5 files
+are loaded with tf.keras.
+"""
+import argparse
+import os
+import struct
+
+import numpy as np
+
+from model.numpy_mlp import save_npz
+
+DEFAULT_MODELS = (
+    'model/keypoint_classifier/keypoint_classifier.tflite',
+    'model/point_history_classifier/point_history_classifier.tflite',
+)
+
+# TFLite schema enums used below
+_FULLY_CONNECTED = 9
+_SOFTMAX = 25
+_DEQUANTIZE = 6
+_RESHAPE = 22
+_FUSED_ACTIVATIONS = {0: 'linear', 1: 'relu'}
+_TENSOR_DTYPES = {0: np.float32, 1: np.float16}
+
+
+class _Table(object):
+    """Minimal read-only FlatBuffers table accessor"""
+    def __init__(self, buf, pos):
+        self.buf = buf
+        self.pos = pos
+        vtable = pos - struct.unpack_from('<i', buf, pos)[0]
+        self._vtable = vtable
+        self._vtable_size = struct.unpack_from('<H', buf, vtable)[0]
+
+    def _field(self, index):
+        entry = 4 + 2 * index
+        if entry >= self._vtable_size:
+            return 0
+        return struct.unpack_from('<H', self.buf, self._vtable + entry)[0]
+
+    def scalar(self, index, fmt, default=0):
+        offset = self._field(index)
+        if not offset:
+            return default
+        return struct.unpack_from(fmt, self.buf, self.pos + offset)[0]
+
+    def _indirect(self, index):
+        offset = self._field(index)
+        if not offset:
+            return None
+        at = self.pos + offset
+        return at + struct.unpack_from('<I', self.buf, at)[0]
+
+    def table(self, index):
+        at = self._indirect(index)
+        return None if at is None else _Table(self.buf, at)
+
+    def tables(self, index):
+        at = self._indirect(index)
+        if at is None:
+            return []
+        length = struct.unpack_from('<I', self.buf, at)[0]
+        result = []
+        for i in range(length):
+            element = at + 4 + 4 * i
+            result.append(_Table(self.buf,
+                                 element + struct.unpack_from('<I', self.buf, element)[0]))
+        return result
+
+    def array(self, index, dtype):
+        at = self._indirect(index)
+        if at is None:
+            return np.empty(0, dtype=dtype)
+        length = struct.unpack_from('<I', self.buf, at)[0]
+        return np.frombuffer(self.buf, dtype=dtype, count=length, offset=at + 4)
+
+
+def read_tflite(path):
+    """Dense layers of a TFLite MLP as (kernels, biases, activations)"""
+    with open(path, 'rb') as f:
+        buf = f.read()
+    if buf[4:8] != b'TFL3':
+        raise ValueError(f'{path}: not a TFLite flatbuffer')
+
+    model = _Table(buf, struct.unpack_from('<I', buf, 0)[0])
+    opcodes = []
+    for code in model.tables(1):
+        # builtin_code (int32) superseded the deprecated int8 field
+        opcodes.append(max(code.scalar(0, '<b'), code.scalar(3, '<i')))
+    buffers = model.tables(4)
+    subgraph = model.tables(2)[0]
+    tensors = subgraph.tables(0)
+
+    def constant(tensor_index):
+        tensor = tensors[tensor_index]
+        dtype = _TENSOR_DTYPES.get(tensor.scalar(1, '<b'))
+        data = buffers[tensor.scalar(2, '<I')].array(0, np.uint8)
+        if dtype is None or data.size == 0:
+            return None
+        shape = tuple(tensor.array(0, '<i4'))
+        return np.frombuffer(data.tobytes(), dtype=dtype).reshape(shape).astype(np.float32)
+
+    kernels, biases, activations = [], [], []
+    dequantized = {}
+    for operator in subgraph.tables(3):
+        opcode = opcodes[operator.scalar(0, '<I')]
+        inputs = operator.array(1, '<i4')
+        outputs = operator.array(2, '<i4')
+        if opcode == _DEQUANTIZE:
+            dequantized[int(outputs[0])] = constant(int(inputs[0]))
+        elif opcode == _FULLY_CONNECTED:
+            weights = [dequantized.get(int(i)) for i in inputs[1:3]]
+            weights = [w if w is not None else constant(int(i))
+                       for w, i in zip(weights, inputs[1:3])]
+            if weights[0] is None or weights[1] is None:
+                raise ValueError(f'{path}: fully connected layer without constant weights')
+            options = operator.table(4)
+            fused = options.scalar(0, '<b') if options is not None else 0
+            if fused not in _FUSED_ACTIVATIONS:
+                raise ValueError(f'{path}: unsupported fused activation {fused}')
+            kernels.append(weights[0].T)  # TFLite stores (out, in)
+            biases.append(weights[1])
+            activations.append(_FUSED_ACTIVATIONS[fused])
+        elif opcode == _SOFTMAX:
+            if not activations or activations[-1] != 'linear':
+                raise ValueError(f'{path}: softmax not directly after a dense layer')
+            activations[-1] = 'softmax'
+        elif opcode != _RESHAPE:
+            raise ValueError(f'{path}: unsupported operator (builtin code {opcode})')
+    return kernels, biases, activations
+
+
+def read_keras(path):
+    """Dense layers of a .keras/.hdf5 Sequential model"""
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(path, compile=False)
+    kernels, biases, activations = [], [], []
+    for layer in model.layers:
+        if isinstance(layer, tf.keras.layers.Dense):
+            kernel, bias = layer.get_weights()
+            kernels.append(kernel)
+            biases.append(bias)
+            activations.append(layer.activation.__name__)
+        elif not isinstance(layer, (tf.keras.layers.Dropout, tf.keras.layers.InputLayer)):
+            raise ValueError(f'{path}: unsupported layer {type(layer).__name__}')
+    return kernels, biases, activations
+
+
+def export(path, output_path=None):
+    if path.endswith('.tflite'):
+        kernels, biases, activations = read_tflite(path)
+    else:
+        kernels, biases, activations = read_keras(path)
+    output_path = output_path or os.path.splitext(path)[0] + '.npz'
+    save_npz(output_path, kernels, biases, activations)
+    return output_path, kernels, activations
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("models", nargs='*', default=list(DEFAULT_MODELS),
+                        help='.tflite, .keras or .hdf5 files')
+    parser.add_argument("--output", help='output path (single model only)')
+
+    args = parser.parse_args()
+
+    return args
+
+
+def main():
+    args = get_args()
+    if args.output and len(args.models) != 1:
+        raise SystemExit('--output needs exactly one model')
+
+    for path in args.models:
+        output_path, kernels, activations = export(path, args.output)
+        layers = ' -> '.join([str(kernels[0].shape[0])] +
+                             [f'{k.shape[1]} ({a})' for k, a in zip(kernels, activations)])
+        print(f'{path} -> {output_path}: {layers}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Export float16 and full-int8 variants of both gesture classifiers.
+
+Run from the repository root (needs TensorFlow):
+    python -m model.export_quantized
+    python -m model.export_quantized --precision int8
+
+The int8 models are calibrated on the training split of the recorded CSV
+datasets, so re-run this after retraining or after collecting more data.
+Variants are written next to the float model as <name>_<precision>.tflite
+and loaded with KeyPointClassifier(precision=...) / PointHistoryClassifier(
+precision=...).
+"""
+import argparse
+import math
+import os
+
+import numpy as np
+
+from model.tflite_loader import variant_path
+
+RANDOM_SEED = 42
+TRAIN_SIZE = 0.75
+
+CLASSIFIERS = {
+    'keypoint': {
+        'dataset': 'model/keypoint_classifier/keypoint.csv',
+        'models': ('model/keypoint_classifier/keypoint_classifier.keras',
+                   'model/keypoint_classifier/keypoint_classifier.hdf5'),
+        'tflite': 'model/keypoint_classifier/keypoint_classifier.tflite',
+    },
+    'point_history': {
+        'dataset': 'model/point_history_classifier/point_history.csv',
+        'models': ('model/point_history_classifier/point_history_classifier.hdf5',),
+        'tflite': 'model/point_history_classifier/point_history_classifier.tflite',
+    },
+}
+
+
+def load_dataset(path):
+    """(features, labels) from a training CSV, label in the first column"""
+    rows = np.loadtxt(path, delimiter=',', dtype=np.float32, ndmin=2)
+    return rows[:, 1:], rows[:, 0].astype(np.int32)
+
+
+def train_test_split(features, labels):
+    """Same split as the training notebooks.
+
+    Matches sklearn's train_test_split(train_size=0.75, random_state=42)
+    without depending on scikit-learn.
+    """
+    num_samples = len(features)
+    num_train = math.floor(TRAIN_SIZE * num_samples)
+    num_test = math.ceil((1.0 - TRAIN_SIZE) * num_samples)
+    permutation = np.random.RandomState(RANDOM_SEED).permutation(num_samples)
+    test, train = permutation[:num_test], permutation[num_test:num_test + num_train]
+    return features[train], features[test], labels[train], labels[test]
+
+
+def convert(model, precision, representative_features=None):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if precision == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    elif precision == 'int8':
+        def representative_dataset():
+            for row in representative_features:
+                yield [row.reshape(1, -1)]
+        converter.representative_dataset = representative_dataset
+        # Full integer: no float fallback, int8 input and output too
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    else:
+        raise ValueError(f'cannot export precision {precision!r}')
+    return converter.convert()
+
+
+def export(name, precisions):
+    import tensorflow as tf
+
+    config = CLASSIFIERS[name]
+    model_path = next((path for path in config['models'] if os.path.exists(path)), None)
+    if model_path is None:
+        print(f'{name}: no Keras model found, skipped')
+        return
+    if not os.path.exists(config['dataset']):
+        print(f"{name}: no dataset at {config['dataset']}, skipped")
+        return
+
+    model = tf.keras.models.load_model(model_path, compile=False)
+    features, labels = load_dataset(config['dataset'])
+    train_features, _, _, _ = train_test_split(features, labels)
+
+    for precision in precisions:
+        output_path = variant_path(config['tflite'], precision)
+        with open(output_path, 'wb') as f:
+            f.write(convert(model, precision, train_features))
+        print(f'{name}: {model_path} -> {output_path} '
+              f'({os.path.getsize(output_path)} bytes)')
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--precision", choices=['float16', 'int8'], action='append',
+                        help='variant to export (repeatable, default: both)')
+    parser.add_argument("--classifier", choices=sorted(CLASSIFIERS), action='append',
+                        help='classifier to export (repeatable, default: both)')
+
+    args = parser.parse_args()
+
+    return args
+
+
+def main():
+    args = get_args()
+    for name in args.classifier or sorted(CLASSIFIERS):
+        export(name, args.precision or ['float16', 'int8'])
+
+
+if __name__ == '__main__':
+    main()
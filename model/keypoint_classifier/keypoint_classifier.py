@@ -1,7 +1,10 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import numpy as np
-import tensorflow as tf
+
+from model.numpy_mlp import NumpyMLP
+from model.tflite_loader import (dequantize, load_interpreter, quantization,
+                                  quantize, variant_path)
 
 
 class KeyPointClassifier(object):
@@ -9,28 +12,97 @@ class KeyPointClassifier(object):
         self,
         model_path='model/keypoint_classifier/keypoint_classifier.tflite',
         num_threads=1,
+        backend='tflite',
+        precision='float32',
+        npz_path='model/keypoint_classifier/keypoint_classifier.npz',
     ):
-        self.interpreter = tf.lite.Interpreter(model_path=model_path,
-                                               num_threads=num_threads)
+        # backend='numpy' runs the weights exported by model/export_npz.py
+        # and does not need TensorFlow or tflite_runtime at all
+        self.backend = backend
+        self.precision = precision
+        self._batch_size = 1
+        self._batch_scores = None
+        self.mlp = None
+        if backend == 'numpy':
+            if precision != 'float32':
+                raise ValueError('the numpy backend only runs float32 weights')
+            self.mlp = NumpyMLP(npz_path)
+            return
+        if backend != 'tflite':
+            raise ValueError(f"unknown backend {backend!r}, use 'tflite' or 'numpy'")
+
+        # precision='float16'/'int8' loads the variant written by
+        # model/export_quantized.py next to model_path
+        self.interpreter = load_interpreter(variant_path(model_path, precision),
+                                            num_threads)
 
         self.interpreter.allocate_tensors()
         self.input_details = self.interpreter.get_input_details()
         self.output_details = self.interpreter.get_output_details()
+        # Full-int8 models take and return quantized tensors
+        self._input_quantization = quantization(self.input_details[0])
+        self._output_quantization = quantization(self.output_details[0])
 
-    def __call__(
-        self,
-        landmark_list,
-    ):
+    def _resize(self, batch_size):
+        """Resize the input tensor to batch_size rows (only when it changes)"""
+        if batch_size == self._batch_size:
+            return
         input_details_tensor_index = self.input_details[0]['index']
-        self.interpreter.set_tensor(
-            input_details_tensor_index,
-            np.array([landmark_list], dtype=np.float32))
+        num_features = self.input_details[0]['shape'][-1]
+        self.interpreter.resize_tensor_input(input_details_tensor_index,
+                                             [batch_size, num_features])
+        self.interpreter.allocate_tensors()
+        self._batch_size = batch_size
+
+    def _invoke(self, inputs):
+        """(N, num_features) float32 -> (N, num_classes) scores"""
+        if self.mlp is not None:
+            return self.mlp(inputs)
+
+        self._resize(len(inputs))
+        if self._input_quantization is not None:
+            inputs = quantize(inputs, self._input_quantization)
+        self.interpreter.set_tensor(self.input_details[0]['index'], inputs)
         self.interpreter.invoke()
 
-        output_details_tensor_index = self.output_details[0]['index']
+        # Copy the output out of the interpreter into a buffer reused
+        # across calls with the same batch size
+        output = self.interpreter.tensor(self.output_details[0]['index'])()
+        if self._batch_scores is None or self._batch_scores.shape != output.shape:
+            self._batch_scores = np.empty(output.shape, dtype=np.float32)
+        if self._output_quantization is not None:
+            dequantize(output, self._output_quantization, self._batch_scores)
+        else:
+            np.copyto(self._batch_scores, output)
+        del output
+        return self._batch_scores
 
-        result = self.interpreter.get_tensor(output_details_tensor_index)
+    def __call__(
+        self,
+        landmark_list,
+    ):
+        result = self._invoke(
+            np.asarray(landmark_list, dtype=np.float32).reshape(1, -1))
 
         result_index = np.argmax(np.squeeze(result))
 
         return result_index
+
+    def classify_batch(self, landmark_lists):
+        """Classify N pre-processed landmark vectors with a single call.
+
+        landmark_lists: (N, 42) array. Returns (ids, scores), two (N,) arrays
+        with the arg-max class and its score for every row.
+        """
+        landmark_lists = np.asarray(landmark_lists, dtype=np.float32)
+        if landmark_lists.ndim == 1:
+            landmark_lists = landmark_lists[np.newaxis]
+        batch_size = len(landmark_lists)
+        if batch_size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = self._invoke(landmark_lists)
+
+        ids = np.argmax(scores, axis=1)
+        scores = scores[np.arange(batch_size), ids]
+        return ids, scores
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import numpy as np
+
+ACTIVATIONS = ('linear', 'relu', 'softmax')
+
+
+class NumpyMLP(object):
+    """Dense network evaluated with NumPy only, weights from an .npz file.
+
+    The file holds kernel_<i> (in, out) and bias_<i> (out,) float32 arrays for
+    every layer plus an activations string array, as written by
+    model/export_npz.py. Runs in float32 like the TFLite kernels do.
+    """
+
+    def __init__(self, path):
+        with np.load(path, allow_pickle=False) as data:
+            activations = [str(name) for name in data['activations']]
+            self.kernels = [np.ascontiguousarray(data[f'kernel_{i}'], dtype=np.float32)
+                            for i in range(len(activations))]
+            self.biases = [np.ascontiguousarray(data[f'bias_{i}'], dtype=np.float32)
+                           for i in range(len(activations))]
+        for name in activations:
+            if name not in ACTIVATIONS:
+                raise ValueError(f'{path}: unsupported activation {name!r}')
+        self.activations = activations
+
+        self.num_features = self.kernels[0].shape[0]
+        self.num_classes = self.kernels[-1].shape[1]
+
+    def __call__(self, inputs):
+        """(N, num_features) float32 -> (N, num_classes) float32 scores"""
+        x = np.asarray(inputs, dtype=np.float32).reshape(-1, self.num_features)
+        for kernel, bias, activation in zip(self.kernels, self.biases,
+                                            self.activations):
+            x = x @ kernel
+            x += bias
+            if activation == 'relu':
+                np.maximum(x, 0.0, out=x)
+            elif activation == 'softmax':
+                x -= x.max(axis=1, keepdims=True)
+                np.exp(x, out=x)
+                x /= x.sum(axis=1, keepdims=True)
+        return x
+
+
+def save_npz(path, kernels, biases, activations):
+    arrays = {'activations': np.array(activations)}
+    for i, (kernel, bias) in enumerate(zip(kernels, biases)):
+        arrays[f'kernel_{i}'] = np.asarray(kernel, dtype=np.float32)
+        arrays[f'bias_{i}'] = np.asarray(bias, dtype=np.float32)
+    np.savez(path, **arrays)
@@ -1,7 +1,10 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import numpy as np
-import tensorflow as tf
+
+from model.numpy_mlp import NumpyMLP
+from model.tflite_loader import (dequantize, load_interpreter, quantization,
+                                  quantize, variant_path)
 
 
 class PointHistoryClassifier(object):
@@ -11,30 +14,80 @@ class PointHistoryClassifier(object):
         score_th=0.5,
         invalid_value=0,
         num_threads=1,
+        backend='tflite',
+        precision='float32',
+        npz_path='model/point_history_classifier/point_history_classifier.npz',
     ):
-        self.interpreter = tf.lite.Interpreter(model_path=model_path,
-                                               num_threads=num_threads)
+        # backend='numpy' runs the weights exported by model/export_npz.py
+        # and does not need TensorFlow or tflite_runtime at all
+        self.score_th = score_th
+        self.invalid_value = invalid_value
+
+        self.backend = backend
+        self.precision = precision
+        self._batch_size = 1
+        self._batch_scores = None
+        self.mlp = None
+        if backend == 'numpy':
+            if precision != 'float32':
+                raise ValueError('the numpy backend only runs float32 weights')
+            self.mlp = NumpyMLP(npz_path)
+            return
+        if backend != 'tflite':
+            raise ValueError(f"unknown backend {backend!r}, use 'tflite' or 'numpy'")
+
+        # precision='float16'/'int8' loads the variant written by
+        # model/export_quantized.py next to model_path
+        self.interpreter = load_interpreter(variant_path(model_path, precision),
+                                            num_threads)
 
         self.interpreter.allocate_tensors()
         self.input_details = self.interpreter.get_input_details()
         self.output_details = self.interpreter.get_output_details()
+        # Full-int8 models take and return quantized tensors
+        self._input_quantization = quantization(self.input_details[0])
+        self._output_quantization = quantization(self.output_details[0])
 
-        self.score_th = score_th
-        self.invalid_value = invalid_value
+    def _resize(self, batch_size):
+        """Resize the input tensor to batch_size rows (only when it changes)"""
+        if batch_size == self._batch_size:
+            return
+        input_details_tensor_index = self.input_details[0]['index']
+        num_features = self.input_details[0]['shape'][-1]
+        self.interpreter.resize_tensor_input(input_details_tensor_index,
+                                             [batch_size, num_features])
+        self.interpreter.allocate_tensors()
+        self._batch_size = batch_size
+
+    def _invoke(self, inputs):
+        """(N, num_features) float32 -> (N, num_classes) scores"""
+        if self.mlp is not None:
+            return self.mlp(inputs)
+
+        self._resize(len(inputs))
+        if self._input_quantization is not None:
+            inputs = quantize(inputs, self._input_quantization)
+        self.interpreter.set_tensor(self.input_details[0]['index'], inputs)
+        self.interpreter.invoke()
+
+        # Copy the output out of the interpreter into a buffer reused
+        # across calls with the same batch size
+        output = self.interpreter.tensor(self.output_details[0]['index'])()
+        if self._batch_scores is None or self._batch_scores.shape != output.shape:
+            self._batch_scores = np.empty(output.shape, dtype=np.float32)
+        if self._output_quantization is not None:
+            dequantize(output, self._output_quantization, self._batch_scores)
+        else:
+            np.copyto(self._batch_scores, output)
+        del output
+        return self._batch_scores
 
     def __call__(
         self,
         point_history,
     ):
-        input_details_tensor_index = self.input_details[0]['index']
-        self.interpreter.set_tensor(
-            input_details_tensor_index,
-            np.array([point_history], dtype=np.float32))
-        self.interpreter.invoke()
-
-        output_details_tensor_index = self.output_details[0]['index']
-
-        result = self.interpreter.get_tensor(output_details_tensor_index)
+        result = self._invoke(
+            np.asarray(point_history, dtype=np.float32).reshape(1, -1))
 
         result_index = np.argmax(np.squeeze(result))
 
@@ -42,3 +95,24 @@ class PointHistoryClassifier(object):
             result_index = self.invalid_value
 
         return result_index
+
+    def classify_batch(self, point_histories):
+        """Classify N pre-processed point histories with a single call.
+
+        point_histories: (N, 32) array. Returns (ids, scores), two (N,) arrays
+        with the arg-max class and its score for every row; rows scoring
+        below score_th get invalid_value as id.
+        """
+        point_histories = np.asarray(point_histories, dtype=np.float32)
+        if point_histories.ndim == 1:
+            point_histories = point_histories[np.newaxis]
+        batch_size = len(point_histories)
+        if batch_size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = self._invoke(point_histories)
+
+        ids = np.argmax(scores, axis=1)
+        scores = scores[np.arange(batch_size), ids]
+        ids[scores < self.score_th] = self.invalid_value
+        return ids, scores
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+
+import numpy as np
+
+PRECISIONS = ('float32', 'float16', 'int8')
+
+
+def load_interpreter(model_path, num_threads=1):
+    """TFLite interpreter from tflite_runtime if installed, else TensorFlow.
+
+    tflite_runtime is a few MB and imports in a fraction of the time the full
+    TensorFlow package takes, and runs the same .tflite files.
+    """
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter(model_path=model_path, num_threads=num_threads)
+
+
+def variant_path(model_path, precision):
+    """foo.tflite -> foo_int8.tflite etc., as written by model/export_quantized.py"""
+    if precision not in PRECISIONS:
+        raise ValueError(f"unknown precision {precision!r}, use one of {PRECISIONS}")
+    if precision == 'float32':
+        return model_path
+    stem, extension = os.path.splitext(model_path)
+    return f'{stem}_{precision}{extension}'
+
+
+def quantization(tensor_details):
+    """(scale, zero_point, dtype) of an integer tensor, None for float tensors"""
+    dtype = tensor_details['dtype']
+    if not np.issubdtype(dtype, np.integer):
+        return None
+    scale, zero_point = tensor_details['quantization']
+    return scale, zero_point, dtype
+
+
+def quantize(values, params):
+    scale, zero_point, dtype = params
+    info = np.iinfo(dtype)
+    return np.clip(np.round(values / scale + zero_point),
+                   info.min, info.max).astype(dtype)
+
+
+def dequantize(values, params, out):
+    scale, zero_point, _ = params
+    # Widen before subtracting, int8 arithmetic would wrap around
+    np.copyto(out, values, casting='unsafe')
+    out -= zero_point
+    out *= scale
+    return out
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Replay recorded landmark streams through MultiHandController.
+
+The controller runs on a virtual clock and sends its actions to a
+RecordingActions sink, so no camera, display or real keyboard is needed
+and a session replays as fast as the gesture logic can run.
+
+Stream format (JSON Lines), one frame per line:
+    {"t": 12.345, "landmarks": [[x, y], ... 21 points], "hand_sign_id": 4}
+"landmarks" are pixel coordinates in the mirrored camera image, or null
+when no hand was detected. "hand_sign_id" is optional, frames without it
+are classified with KeyPointClassifier. An optional first line
+{"width": 960, "height": 540} gives the camera size.
+
+JSON Lines streams hold a single hand. Binary sessions written by
+`app.py --record` are read directly and replay every hand, each with the
+state of its recorded track ID.
+"""
+import argparse
+import json
+import time
+from collections import Counter
+
+import numpy as np
+
+from scripts.actions import RecordingActions
+from scripts.presentation_control import MultiHandController
+from scripts.presentation_control import tracked_point
+from scripts.spotlight_control import SpotlightController
+from scripts.window_focus import FakeWindowBackend, WindowFocusTracker
+from utils.clock import VirtualClock
+from utils.gesture_smoother import GestureSmoother
+from utils.point_history import PointHistory
+from utils.landmarks import calc_landmark_list, pre_process_landmark
+from utils.session_recorder import MAGIC, SessionReader
+
+
+class ReplayHand(object):
+    """One hand of a recorded frame"""
+    def __init__(self, landmark_list, hand_sign_id=None, finger_gesture_id=0,
+                 track_id=0):
+        self.landmark_list = landmark_list
+        self.hand_sign_id = hand_sign_id
+        self.finger_gesture_id = finger_gesture_id
+        self.track_id = track_id
+
+
+class ReplayFrame(object):
+    """One recorded camera frame, with the ReplayHand of every detected hand.
+    predicted: the live pipeline extrapolated the landmarks instead of
+    running detection"""
+    def __init__(self, timestamp, hands=(), predicted=False):
+        self.timestamp = timestamp
+        self.hands = list(hands)
+        self.predicted = predicted
+
+
+class ReplayHandState(object):
+    """What the engine remembers about one hand track, like app.HandState"""
+    def __init__(self, history_length, sign_smoothing):
+        self.point_history = PointHistory(history_length)
+        # Same votes as FrameProcessor, recordings hold the raw IDs
+        self.sign_smoother = GestureSmoother(window=sign_smoothing)
+        self.finger_gesture_smoother = GestureSmoother(window=history_length)
+        self.sign_id = None
+        self.sign_onset = 0.0
+        self.missed = 0
+
+
+class ReplayEngine(object):
+    """Feeds frames through MultiHandController.handle_gestures.
+
+    Every track ID gets its own point history and votes, which are kept
+    for max_missed frames without the hand like HandTracker does, so the
+    frames go through the same bookkeeping as the live pipeline. For every
+    recorded action the latency since the hand sign that triggered it first
+    appeared is kept in `latencies`.
+    """
+    def __init__(self, cam_width, cam_height, history_length=16,
+                 screen_size=(1280, 720), keypoint_classifier=None,
+                 sign_smoothing=5, max_missed=5):
+        self.clock = VirtualClock()
+        self.actions = RecordingActions(screen_size, clock=self.clock)
+        # Focus changes are recorded too, the real desktop is left alone
+        self.windows = FakeWindowBackend()
+        spotlight_controller = SpotlightController(
+            self.actions, self.clock,
+            window_tracker=WindowFocusTracker(self.windows, clock=self.clock))
+        self.controller = MultiHandController(cam_width, cam_height,
+                                              actions=self.actions,
+                                              clock=self.clock,
+                                              spotlight_controller=spotlight_controller)
+        self.keypoint_classifier = keypoint_classifier
+        self.history_length = history_length
+        self.sign_smoothing = sign_smoothing
+        self.max_missed = max_missed
+        self.hand_states = {}  # track ID -> ReplayHandState
+
+        self.frame_count = 0
+        self.predicted_frames = 0  # Frames the live pipeline did not detect
+        self.latencies = []  # (action, seconds since hand sign onset)
+
+    def _classifier(self):
+        if self.keypoint_classifier is None:
+            # Only pulled in when the stream has no recorded hand signs
+            from model import KeyPointClassifier
+            self.keypoint_classifier = KeyPointClassifier()
+        return self.keypoint_classifier
+
+    def classify(self, landmark_list):
+        return self._classifier()(pre_process_landmark(landmark_list))
+
+    def classify_frames(self, frames):
+        """Fill in missing hand signs with one batched classifier call"""
+        pending = [hand for frame in frames for hand in frame.hands
+                   if hand.hand_sign_id is None]
+        if not pending:
+            return
+        features = np.stack([pre_process_landmark(hand.landmark_list)
+                             for hand in pending])
+        hand_sign_ids, _ = self._classifier().classify_batch(features)
+        for hand, hand_sign_id in zip(pending, hand_sign_ids):
+            hand.hand_sign_id = int(hand_sign_id)
+
+    def feed(self, frame):
+        self.clock.advance_to(frame.timestamp)
+        self.frame_count += 1
+        self.predicted_frames += frame.predicted
+
+        present = {hand.track_id for hand in frame.hands}
+        for track_id in list(self.hand_states):
+            if track_id in present:
+                continue
+            state = self.hand_states[track_id]
+            state.missed += 1
+            if state.missed > self.max_missed:
+                del self.hand_states[track_id]
+                continue
+            state.point_history.append([0, 0], frame.timestamp)
+            # A hand that comes back starts a fresh vote
+            state.sign_smoother.reset()
+            state.sign_id = None
+        for track_id in present:
+            if track_id not in self.hand_states:
+                self.hand_states[track_id] = ReplayHandState(
+                    self.history_length, self.sign_smoothing)
+        self.controller.retain(self.hand_states)
+
+        for hand in frame.hands:
+            state = self.hand_states[hand.track_id]
+            state.missed = 0
+
+            raw_hand_sign_id = hand.hand_sign_id
+            if raw_hand_sign_id is None:
+                raw_hand_sign_id = self.classify(hand.landmark_list)
+
+            # Latency counts from the first frame the classifier saw the sign,
+            # so the smoothing delay is included
+            if raw_hand_sign_id != state.sign_id:
+                state.sign_id = raw_hand_sign_id
+                state.sign_onset = self.clock.time()
+            hand_sign_id = state.sign_smoother.update(raw_hand_sign_id)
+            finger_gesture_id = state.finger_gesture_smoother.update(
+                hand.finger_gesture_id)
+
+            state.point_history.append(tracked_point(hand_sign_id,
+                                                     hand.landmark_list),
+                                       frame.timestamp)
+
+            event_count = len(self.actions.events)
+            self.controller.handle_gestures(hand.track_id,
+                                            hand_sign_id,
+                                            finger_gesture_id,
+                                            hand.landmark_list,
+                                            state.point_history.points())
+            for _, action, _ in self.actions.events[event_count:]:
+                if action in ('press', 'hotkey'):
+                    self.latencies.append(
+                        (action, self.clock.time() - state.sign_onset))
+
+    def run(self, frames):
+        frames = list(frames)
+        self.classify_frames(frames)
+        for frame in frames:
+            self.feed(frame)
+        return self.actions.events
+
+
+def read_jsonl_stream(path):
+    """Returns ((width, height) or None, list of ReplayFrame)"""
+    size = None
+    frames = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if 't' not in record:
+                size = (record['width'], record['height'])
+                continue
+            hands = []
+            if record.get('landmarks') is not None:
+                hands.append(ReplayHand(record['landmarks'],
+                                        record.get('hand_sign_id'),
+                                        record.get('finger_gesture_id', 0)))
+            frames.append(ReplayFrame(record['t'], hands, record.get('predicted', False)))
+    return size, frames
+
+
+def read_binary_session(path, start=None, end=None):
+    """Returns ((width, height), list of ReplayFrame) for [start, end) seconds"""
+    reader = SessionReader(path)
+    frames = []
+    for _, timestamp, records in reader.frames(reader.time_slice(start, end)):
+        hands = []
+        for record in records:
+            track_id = int(record['track_id'])
+            if track_id < 0:
+                continue
+            landmark_list = calc_landmark_list(record['landmarks'], reader.width,
+                                               reader.height).tolist()
+            hand_sign_id = int(record['hand_sign_id'])
+            hands.append(ReplayHand(landmark_list,
+                                    hand_sign_id if hand_sign_id >= 0 else None,
+                                    max(int(record['finger_gesture_id']), 0),
+                                    track_id))
+        frames.append(ReplayFrame(timestamp, hands, bool(records['predicted'][0])))
+    return (reader.width, reader.height), frames
+
+
+def read_stream(path, start=None, end=None):
+    with open(path, 'rb') as f:
+        is_binary = f.read(len(MAGIC)) == MAGIC
+    if is_binary:
+        return read_binary_session(path, start, end)
+
+    size, frames = read_jsonl_stream(path)
+    if frames and (start is not None or end is not None):
+        origin = frames[0].timestamp
+        frames = [frame for frame in frames
+                  if (start is None or frame.timestamp - origin >= start) and
+                  (end is None or frame.timestamp - origin < end)]
+    return size, frames
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("stream",
+                        help='recorded session (app.py --record) or .jsonl stream')
+    parser.add_argument("--width", help='cap width', type=int, default=960)
+    parser.add_argument("--height", help='cap height', type=int, default=540)
+    parser.add_argument("--start", help='seconds into the session to start at',
+                        type=float, default=None)
+    parser.add_argument("--end", help='seconds into the session to stop at',
+                        type=float, default=None)
+    parser.add_argument("--sign_smoothing",
+                        help='hand sign vote window, same as app.py (1 = off)',
+                        type=int,
+                        default=5)
+    parser.add_argument("--repeat",
+                        help='replay the stream this many times (benchmarking)',
+                        type=int,
+                        default=1)
+    parser.add_argument("--events", help='print every recorded action',
+                        action='store_true')
+
+    args = parser.parse_args()
+
+    return args
+
+
+def main():
+    args = get_args()
+
+    size, frames = read_stream(args.stream, args.start, args.end)
+    cam_width, cam_height = size or (args.width, args.height)
+    if not frames:
+        print("Stream has no frames")
+        return
+
+    duration = frames[-1].timestamp - frames[0].timestamp
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        engine = ReplayEngine(cam_width, cam_height,
+                              sign_smoothing=args.sign_smoothing)
+        events = engine.run(frames)
+    elapsed = (time.perf_counter() - start) / args.repeat
+
+    if args.events:
+        for timestamp, action, action_args in events:
+            print(f"{timestamp - frames[0].timestamp:8.3f}s  {action} {action_args}")
+
+    counts = Counter(action for _, action, _ in events)
+    print(f"Frames: {engine.frame_count} ({engine.predicted_frames} predicted), "
+          f"stream duration: {duration:.2f} s, "
+          f"replay time: {elapsed * 1000:.1f} ms "
+          f"({duration / elapsed if elapsed else 0:.0f}x real time)")
+    print("Actions:", dict(counts))
+    if engine.latencies:
+        latencies = sorted(latency for _, latency in engine.latencies)
+        print(f"Gesture latency: median {latencies[len(latencies) // 2] * 1000:.0f} ms, "
+              f"max {latencies[-1] * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
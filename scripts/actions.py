@@ -0,0 +1,217 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import cv2
+import numpy as np
+
+from utils.clock import SystemClock
+from utils.stage_metrics import StageMetrics
+
+
+def run_inline(fn, *args):
+    """Run a job on the calling thread, returns its already finished Future"""
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+class PyAutoGuiActions:
+    """Sends keyboard/mouse actions to the OS and owns the overlay windows.
+
+    pyautogui is imported on first use, so replays and tools that never
+    touch the real desktop do not need a display.
+    """
+    def __init__(self):
+        self._pyautogui = None
+
+    @property
+    def pyautogui(self):
+        if self._pyautogui is None:
+            import pyautogui
+            self._pyautogui = pyautogui
+        return self._pyautogui
+
+    def press(self, key):
+        self.pyautogui.press(key)
+
+    def hotkey(self, *keys):
+        self.pyautogui.hotkey(*keys)
+
+    def move_rel(self, dx, dy):
+        self.pyautogui.moveRel(dx, dy)
+
+    def screen_size(self):
+        return self.pyautogui.size()
+
+    def screenshot(self):
+        """Current screen as a BGR image at screen resolution"""
+        screen = self.pyautogui.screenshot()
+        screen_width, screen_height = self.screen_size()
+        screen = screen.resize((screen_width, screen_height))
+        return cv2.cvtColor(np.array(screen), cv2.COLOR_RGB2BGR)
+
+    def show_overlay(self, window_name, image):
+        cv2.namedWindow(window_name, cv2.WND_PROP_FULLSCREEN)
+        cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+        cv2.imshow(window_name, image)
+        cv2.setWindowProperty(window_name, cv2.WND_PROP_TOPMOST, 1)
+
+    def hide_overlay(self, window_name):
+        cv2.destroyWindow(window_name)
+
+    def submit(self, name, fn, *args):
+        return run_inline(fn, *args)
+
+
+class RecordingActions:
+    """Action sink that records what would have been sent to the OS.
+
+    Every call is stored in `events` as (timestamp, action, args). Overlay
+    updates only record the window name, not the image.
+    """
+    def __init__(self, screen_size=(1280, 720), clock=None):
+        self.clock = clock or SystemClock()
+        self._screen_size = tuple(screen_size)
+        self.events = []
+
+    def _record(self, action, *args):
+        self.events.append((self.clock.time(), action, args))
+
+    def press(self, key):
+        self._record('press', key)
+
+    def hotkey(self, *keys):
+        self._record('hotkey', *keys)
+
+    def move_rel(self, dx, dy):
+        self._record('move_rel', dx, dy)
+
+    def screen_size(self):
+        return self._screen_size
+
+    def screenshot(self):
+        self._record('screenshot')
+        screen_width, screen_height = self._screen_size
+        return np.zeros((screen_height, screen_width, 3), dtype=np.uint8)
+
+    def show_overlay(self, window_name, image):
+        self._record('show_overlay', window_name)
+
+    def hide_overlay(self, window_name):
+        self._record('hide_overlay', window_name)
+
+    def submit(self, name, fn, *args):
+        # Inline, so replays stay deterministic on the virtual clock
+        return run_inline(fn, *args)
+
+
+class ActionDispatcher:
+    """Runs an action sink's OS calls on a worker thread.
+
+    press(), hotkey() and move_rel() return immediately and run in order on
+    the worker. A move queued behind another move that has not run yet is
+    merged into it, so a slow OS call never leaves a backlog of stale cursor
+    moves. Longer jobs (screenshots, window focus changes and their sleeps)
+    go through submit(), which returns a Future. The overlay windows are
+    HighGUI and stay on the calling thread; the screen size is read once,
+    on the worker, and cached.
+
+    Every action records its queue wait ('action.<name>.wait') and run time
+    ('action.<name>') into `metrics`.
+    """
+    def __init__(self, actions=None, metrics=None):
+        self.actions = actions or PyAutoGuiActions()
+        self.metrics = metrics or StageMetrics()
+        self.coalesced = 0
+        self.failed = 0
+        self._queue = deque()  # [name, fn, args, queued at, future]
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._screen_size = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='actions', daemon=True)
+        self._thread.start()
+        # Imports pyautogui off the frame loop as well
+        self._screen_size = self.submit('screen_size', self.actions.screen_size)
+        return self
+
+    def stop(self, timeout=2.0):
+        """Run what is still queued (e.g. a focus restore), then stop"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def submit(self, name, fn, *args):
+        future = Future()
+        with self._condition:
+            self._queue.append([name, fn, list(args), time.perf_counter(), future])
+            self._condition.notify()
+        return future
+
+    def press(self, key):
+        self.submit('press', self.actions.press, key)
+
+    def hotkey(self, *keys):
+        self.submit('hotkey', self.actions.hotkey, *keys)
+
+    def move_rel(self, dx, dy):
+        with self._condition:
+            if self._queue and self._queue[-1][0] == 'move_rel':
+                pending = self._queue[-1][2]
+                pending[0] += dx
+                pending[1] += dy
+                self.coalesced += 1
+                self.metrics.increment('action.move_rel.coalesced')
+                return
+        self.submit('move_rel', self.actions.move_rel, dx, dy)
+
+    def screen_size(self):
+        # Only waits if a gesture needs it before the worker got to it
+        return tuple(self._screen_size.result())
+
+    def screenshot(self):
+        """Blocking, call it from a submit()ted job"""
+        return self.actions.screenshot()
+
+    def show_overlay(self, window_name, image):
+        self.actions.show_overlay(window_name, image)
+
+    def hide_overlay(self, window_name):
+        self.actions.hide_overlay(window_name)
+
+    def stats(self):
+        with self._condition:
+            queued = len(self._queue)
+        return {'queued': queued, 'coalesced': self.coalesced, 'failed': self.failed}
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and self._running:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                name, fn, args, queued_at, future = self._queue.popleft()
+
+            start = time.perf_counter()
+            self.metrics.record(f'action.{name}.wait', start - queued_at)
+            try:
+                result = fn(*args)
+            except Exception as e:
+                self.failed += 1
+                self.metrics.increment('action.failed')
+                print(f"Action {name} failed: {e}")
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            self.metrics.record(f'action.{name}', time.perf_counter() - start)
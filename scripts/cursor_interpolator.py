@@ -0,0 +1,196 @@
+import math
+import threading
+import time
+
+from utils.clock import SystemClock
+
+
+class SensitivityCurve:
+    """Cursor gain for a finger speed: precise when slow, quick when fast.
+
+    Linear between (low_speed, low_gain) and (high_speed, high_gain) and
+    flat outside, speeds in camera pixels per second. The defaults give the
+    old fixed gain of 1.5 at about 430 px/s.
+    """
+    def __init__(self, low_speed=100.0, low_gain=1.0, high_speed=1100.0, high_gain=2.5):
+        self.low_speed = low_speed
+        self.low_gain = low_gain
+        self.high_speed = high_speed
+        self.high_gain = high_gain
+
+    def __call__(self, speed):
+        if speed <= self.low_speed:
+            return self.low_gain
+        if speed >= self.high_speed:
+            return self.high_gain
+        fraction = (speed - self.low_speed) / (self.high_speed - self.low_speed)
+        return self.low_gain + fraction * (self.high_gain - self.low_gain)
+
+
+class CursorInterpolator:
+    """Turns camera-rate finger samples into cursor moves at `rate` Hz.
+
+    Between samples the finger is extrapolated along its last velocity, at
+    most max_prediction seconds past the newest sample, which hides part
+    of the camera latency without running away once the finger stops. Each
+    tick the cursor keeps its velocity and closes `correction` of the gap to
+    that prediction, so new samples are blended in instead of jumped to. The
+    rendered finger motion is scaled by `sensitivity` (a SensitivityCurve)
+    and sent as whole-pixel move_rel() calls, carrying the fractions over.
+
+    When a sample shows the prediction went further than the finger did,
+    the distance along the direction of motion is kept as overshoot.
+    Samples from a different `source` than the last one start over instead
+    of jumping the cursor.
+    """
+    def __init__(self, actions, sensitivity=None, rate=120.0, max_prediction=0.05,
+                 correction=0.3, clock=None):
+        self.actions = actions
+        self.sensitivity = sensitivity or SensitivityCurve()
+        self.rate = rate
+        self.max_prediction = max_prediction
+        self.correction = correction  # Share of the gap to the prediction closed per tick
+        self.clock = clock or SystemClock()
+
+        self._lock = threading.Lock()
+        self._source = None
+        self._previous = None  # (timestamp, x, y)
+        self._latest = None
+        self._rendered = None  # Finger position the cursor has been moved for
+        self._remainder = [0.0, 0.0]
+
+        self.ticks = 0
+        self.moves = 0
+        self.samples = 0
+        self.active_time = 0.0  # Seconds with a moving finger to follow
+        self.overshoots = 0
+        self.overshoot_total = 0.0
+        self.overshoot_max = 0.0
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='cursor', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def reset(self, source=None):
+        """Finger gone, stop following it. With a source, only if that is
+        the finger being followed"""
+        with self._lock:
+            if source is not None and source != self._source:
+                return
+            self._source = None
+            self._previous = self._latest = self._rendered = None
+            self._remainder = [0.0, 0.0]
+
+    def add_sample(self, timestamp, point, source=None):
+        x, y = float(point[0]), float(point[1])
+        with self._lock:
+            self.samples += 1
+            if source != self._source or self._latest is None:
+                self._source = source
+                self._previous = None
+                self._latest = self._rendered = (timestamp, x, y)
+                self._remainder = [0.0, 0.0]
+                return
+
+            if self._previous is not None:
+                self._measure_overshoot(x, y)
+            self._previous, self._latest = self._latest, (timestamp, x, y)
+
+    def _measure_overshoot(self, x, y):
+        _, previous_x, previous_y = self._previous
+        _, latest_x, latest_y = self._latest
+        direction_x, direction_y = latest_x - previous_x, latest_y - previous_y
+        length = math.hypot(direction_x, direction_y)
+        if length == 0:
+            return
+        _, rendered_x, rendered_y = self._rendered
+        overshoot = ((rendered_x - x) * direction_x + (rendered_y - y) * direction_y) / length
+        if overshoot > 0:
+            self.overshoots += 1
+            self.overshoot_total += overshoot
+            self.overshoot_max = max(self.overshoot_max, overshoot)
+
+    def tick(self, now=None):
+        """Emit the cursor move for time `now`, returns the (dx, dy) sent"""
+        now = self.clock.time() if now is None else now
+        with self._lock:
+            self.ticks += 1
+            if self._previous is None:
+                if self._latest is not None:
+                    # Holding still on the first sample until it moves
+                    self._rendered = (now,) + self._latest[1:]
+                return (0, 0)
+            t0, x0, y0 = self._previous
+            t1, x1, y1 = self._latest
+            interval = t1 - t0
+            if interval <= 0:
+                return (0, 0)
+            velocity_x, velocity_y = (x1 - x0) / interval, (y1 - y0) / interval
+            ahead = min(max(now - t1, 0.0), self.max_prediction)
+            target_x, target_y = x1 + velocity_x * ahead, y1 + velocity_y * ahead
+
+            # Keep going at the finger's velocity and close part of the gap
+            # to the prediction, so a new sample never makes the cursor jump
+            rendered_time, rendered_x, rendered_y = self._rendered
+            step = min(max(now - rendered_time, 0.0), self.max_prediction)
+            next_x = rendered_x + velocity_x * step
+            next_y = rendered_y + velocity_y * step
+            next_x += (target_x - next_x) * self.correction
+            next_y += (target_y - next_y) * self.correction
+            self._rendered = (now, next_x, next_y)
+            if math.hypot(velocity_x, velocity_y) > 0 and ahead < self.max_prediction:
+                self.active_time += 1.0 / self.rate
+
+            # Gain by how fast the cursor moves this tick, so a correction
+            # back is scaled like the motion it corrects
+            move_x, move_y = next_x - rendered_x, next_y - rendered_y
+            speed = math.hypot(move_x, move_y) / step if step > 0 else 0.0
+            gain = self.sensitivity(speed)
+            self._remainder[0] += move_x * gain
+            self._remainder[1] += move_y * gain
+            dx, dy = round(self._remainder[0]), round(self._remainder[1])
+            self._remainder[0] -= dx
+            self._remainder[1] -= dy
+
+        if dx or dy:
+            self.moves += 1
+            self.actions.move_rel(dx, dy)
+        return (dx, dy)
+
+    def _run(self):
+        period = 1.0 / self.rate
+        next_tick = time.perf_counter()
+        while not self._stop_event.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Cursor move failed: {e}")
+            next_tick += period
+            delay = next_tick - time.perf_counter()
+            if delay < 0:
+                # Fell behind, do not try to catch up with a burst
+                next_tick = time.perf_counter()
+                delay = 0
+            self._stop_event.wait(delay)
+
+    def stats(self):
+        """Effective move rate while following the finger, and overshoot in
+        camera pixels"""
+        return {
+            'update_hz': round(self.moves / self.active_time, 1) if self.active_time else 0.0,
+            'samples': self.samples,
+            'moves': self.moves,
+            'overshoots': self.overshoots,
+            'overshoot_mean_px': (round(self.overshoot_total / self.overshoots, 2)
+                                  if self.overshoots else 0.0),
+            'overshoot_max_px': round(self.overshoot_max, 2),
+        }
@@ -1,33 +1,50 @@
-import pyautogui
-import time
+import math
+
+from scripts.actions import PyAutoGuiActions
+from scripts.cursor_interpolator import SensitivityCurve
+from utils.clock import SystemClock
 
 class MoveController:
-    def __init__(self):
+    def __init__(self, actions=None, clock=None, sensitivity=None, interpolator=None):
+        self.actions = actions or PyAutoGuiActions()
+        self.clock = clock or SystemClock()
         self.prev_point = None
         self.last_move_time = 0
         self.cooldown = 0.01  # seconds between moves (very low)
-        self.sensitivity = 1.5  # scale the movement (tune this)
+        # Gain by finger speed (tune the curve)
+        self.sensitivity = sensitivity or SensitivityCurve()
+        # Optional CursorInterpolator, which then sends the moves at its own rate
+        self.interpolator = interpolator
 
     def move_cursor(self, current_point):
         """
         Move mouse relative to finger motion.
         current_point: [x, y] coordinates of fingertip (e.g., index finger)
         """
-        current_time = time.time()
+        current_time = self.clock.time()
+        if self.interpolator is not None:
+            self.interpolator.add_sample(current_time, current_point, source=id(self))
+            return
+
         if self.prev_point is None:
             self.prev_point = current_point
+            self.last_move_time = current_time
             return
 
-        if current_time - self.last_move_time < self.cooldown:
+        elapsed = current_time - self.last_move_time
+        if elapsed < self.cooldown:
             return
 
-        dx = (current_point[0] - self.prev_point[0]) * self.sensitivity
-        dy = (current_point[1] - self.prev_point[1]) * self.sensitivity
+        dx = current_point[0] - self.prev_point[0]
+        dy = current_point[1] - self.prev_point[1]
+        gain = self.sensitivity(math.hypot(dx, dy) / elapsed)
 
-        pyautogui.moveRel(dx, dy)
+        self.actions.move_rel(dx * gain, dy * gain)
         self.prev_point = current_point
         self.last_move_time = current_time
 
     def reset(self):
         """Reset previous point when gesture ends or hand is lost"""
         self.prev_point = None
+        if self.interpolator is not None:
+            self.interpolator.reset(source=id(self))
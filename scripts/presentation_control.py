@@ -0,0 +1,250 @@
+import numpy as np
+
+from scripts.actions import PyAutoGuiActions
+from scripts.swipe_control import detect_swipe # For Swipe features
+from scripts.zoom_control import ZoomController # For Zoom features
+from scripts.spotlight_control import SpotlightController # For Spotlight features
+from scripts.move_control import MoveController # For move features
+from scripts.cursor_interpolator import CursorInterpolator
+from utils.clock import SystemClock
+
+#*************************************************************************************************************#
+# Constants
+THREE_FINGER_ID = 4  # Custom '3-finger' hand sign for swiping
+PINCH_IN_ID = 10 # Custom 'pinch in' hand sign for zooming in
+PINCH_OUT_ID = 11 # Custom 'pinch out' hand sign for zooming out
+TWO_FINGER_ID = 10 # Custom '2-finger' hand sign for moving
+POINTING_ID = 2  # Custom 'pointer' hand sign for spotlight
+OK_HAND_ID = 3 # Custom 'Ok' hand sign for spotlight
+
+class PresentationController:
+    def __init__(self, cam_width, cam_height, actions=None, clock=None,
+                 zoom_controller=None, spotlight_controller=None,
+                 cursor_interpolator=None):
+        # Everything that touches the OS or reads the time goes through these,
+        # so recorded sessions can be replayed with a virtual clock
+        self.actions = actions or PyAutoGuiActions()
+        self.clock = clock or SystemClock()
+
+        self.swipe_state = "idle"
+        self.last_swipe_time = 0
+        self.swipe_cooldown = 0.7 # seconds between allowed swipes
+        
+        # Zoom and spotlight act on the one screen, so they can be shared
+        # between the controllers of several hands
+        self.zoom_controller = zoom_controller or ZoomController(self.actions, self.clock)
+        self.move_controller = MoveController(self.actions, self.clock,
+                                              interpolator=cursor_interpolator)
+
+        self.spotlight_controller = (spotlight_controller or
+                                     SpotlightController(self.actions, self.clock))
+        self.pointer_hold_counter = 0
+        self.pointer_hold_threshold = 15  # Number of consecutive frames required
+        self.ok_hand_deactivate_threshold = 6
+        self.cam_width = cam_width
+        self.cam_height = cam_height
+        self.x_min, self.x_max = 100, self.cam_width - 100
+        self.y_min, self.y_max = 100, self.cam_height - 100
+        self.prev_spotlight_pos = None
+        self.smoothing_factor = 0.2  # 0 = no smoothing, 1 = no movement
+
+    
+    def handle_gestures(self, hand_sign_id, fingure_gesture_id, landmark_list, point_history):
+        current_time = self.clock.time()
+
+        # 3-finger swipe detection ###############################################################
+        if hand_sign_id == THREE_FINGER_ID:
+            if len(point_history) >= 2:
+                # Only detect new swipes if cooldown has passed and we're not already swiping
+                if current_time - self.last_swipe_time > self.swipe_cooldown and self.swipe_state != "swiping":
+                    direction = detect_swipe(point_history)
+                    if direction:
+                        self.swipe_state = "swiping"
+                        self.last_swipe_direction = direction
+                
+                # Detect when swipe ends (finger stops moving significantly)
+                if self.swipe_state == "swiping" and self._swipe_ended(point_history):
+                    self._execute_swipe_action(self.last_swipe_direction)
+                    self.swipe_state = "idle"
+                    self.last_swipe_time = current_time
+    
+        # Pointing Gesture (Spotlight)
+
+        # Pinch gestures (zoom)
+        if hand_sign_id == PINCH_OUT_ID:
+            self.zoom_controller.zoom("in")
+        elif hand_sign_id == PINCH_IN_ID:
+            self.zoom_controller.zoom("out")
+
+        # Two-finger drag for moving zoomed screen
+        if hand_sign_id == TWO_FINGER_ID:
+            self.move_controller.move_cursor(landmark_list[8])  # track index finger
+        
+        # Spotlight control logic
+        if hand_sign_id == POINTING_ID:
+            self.pointer_hold_counter = min(self.pointer_hold_counter + 1, self.pointer_hold_threshold)
+            if self.pointer_hold_counter >= self.pointer_hold_threshold:
+                # Only take new screenshot if we're activating spotlight now
+                force_refresh = not self.spotlight_controller.enabled
+                index_finger = tuple(map(int, landmark_list[8]))
+                
+                # Update dynamic min/max observed
+                self.x_min = min(self.x_min, index_finger[0])
+                self.x_max = max(self.x_max, index_finger[0])
+                self.y_min = min(self.y_min, index_finger[1])
+                self.y_max = max(self.y_max, index_finger[1])
+                
+                # Clipping finger within known observed range
+                cam_x = max(self.x_min, min(index_finger[0], self.x_max))
+                cam_y = max(self.y_min, min(index_finger[1], self.y_max))
+                clamped_finger = (cam_x, cam_y)
+                
+                # Map to screen coordinates
+                target_pos = self.dynamic_map_to_screen(clamped_finger)
+
+                # Smoothing logic
+                if not hasattr(self, 'prev_spotlight_pos'):
+                    self.prev_spotlight_pos = None
+                if not hasattr(self, 'smoothing_factor'):
+                    self.smoothing_factor = 0.2  # tweak to your liking
+
+                if self.prev_spotlight_pos is None:
+                    smoothed_pos = target_pos
+                else:
+                    smoothed_pos = (
+                        int(self.prev_spotlight_pos[0] * (1 - self.smoothing_factor) + target_pos[0] * self.smoothing_factor),
+                        int(self.prev_spotlight_pos[1] * (1 - self.smoothing_factor) + target_pos[1] * self.smoothing_factor)
+                    )
+                self.prev_spotlight_pos = smoothed_pos
+
+                self.spotlight_controller.show_spotlight(smoothed_pos, force_refresh)
+
+        # Only deactivate spotlight with OK hand gesture
+        elif hand_sign_id == OK_HAND_ID and self.spotlight_controller.enabled:
+            self.pointer_hold_counter = max(self.pointer_hold_counter - 1, -self.ok_hand_deactivate_threshold)
+            if self.pointer_hold_counter <= -self.ok_hand_deactivate_threshold:
+                self.spotlight_controller.hide_spotlight()
+                self.pointer_hold_counter = 0
+                self.prev_spotlight_pos = None
+        else:
+            # For other gestures, slowly reset counter but keep spotlight active
+            if not self.spotlight_controller.enabled:
+                self.pointer_hold_counter = 0
+            elif abs(self.pointer_hold_counter) > 0:  # Slowly return to zero if not pointing/ok
+                self.pointer_hold_counter = int(self.pointer_hold_counter * 0.8)  # Decay factord:
+                self.pointer_hold_counter = 0
+
+        # Reset swipe state if not in swipe gesture
+        if hand_sign_id != THREE_FINGER_ID:
+            self.swipe_state = "idle"
+        
+        # Reset move controller when gesture ends
+        if hand_sign_id != TWO_FINGER_ID:
+            self.move_controller.reset()
+
+    def dynamic_map_to_screen(self, cam_pos):
+        cam_x, cam_y = cam_pos
+        screen_width, screen_height = self.actions.screen_size()
+
+        # Prevent division by zero
+        x_range = max(self.x_max - self.x_min, 1)
+        y_range = max(self.y_max - self.y_min, 1)
+
+        # Normalize cam_x to [0,1] based on visible range
+        norm_x = (cam_x - self.x_min) / x_range
+        norm_y = (cam_y - self.y_min) / y_range
+
+        screen_x = int(norm_x * screen_width)
+        screen_y = int(norm_y * screen_height)
+        return (screen_x, screen_y)
+
+
+    def _swipe_ended(self, point_history):
+        """Check if finger movement has stopped below threshold"""
+        if len(point_history) < 3:
+            return False
+        
+        # Get last few points (excluding zeros)
+        recent_points = point_history[-3:]
+        if isinstance(recent_points, np.ndarray):
+            recent_points = recent_points.tolist()
+        recent_points = [p for p in recent_points if p != [0, 0]]
+        if len(recent_points) < 2:
+            return False
+
+        # Calculate recent movement
+        total_movement = sum(
+            abs(recent_points[i+1][0] - recent_points[i][0])
+            for i in range(len(recent_points)-1)
+        )
+        return total_movement < 3  # Pixels threshold for "stopped moving"
+
+    def _execute_swipe_action(self, direction):
+        """Execute slide change with debounce checking"""
+        if direction == "left":
+            self.actions.press('right')  # Next slide
+        elif direction == "right":
+            self.actions.press('left')   # Previous slide
+        print(f"Slide changed: {direction}")  # Debug output
+
+class MultiHandController:
+    """One PresentationController per tracked hand.
+
+    Swipe, pointer and move state is kept per hand, so two hands in view
+    cannot corrupt each other's gestures. The zoom and spotlight
+    controllers drive the single screen and are shared by all hands, as is
+    the cursor interpolator when cursor_rate (Hz) is set: the last hand to
+    move takes the cursor over.
+    """
+    def __init__(self, cam_width, cam_height, actions=None, clock=None, cursor_rate=0,
+                 spotlight_controller=None):
+        self.cam_width = cam_width
+        self.cam_height = cam_height
+        self.actions = actions or PyAutoGuiActions()
+        self.clock = clock or SystemClock()
+        self.zoom_controller = ZoomController(self.actions, self.clock)
+        self.spotlight_controller = spotlight_controller or SpotlightController(
+            self.actions, self.clock)
+        self.cursor_interpolator = None
+        if cursor_rate > 0:
+            self.cursor_interpolator = CursorInterpolator(
+                self.actions, rate=cursor_rate, clock=self.clock).start()
+        self.controllers = {}  # track ID -> PresentationController
+
+    def controller(self, track_id):
+        controller = self.controllers.get(track_id)
+        if controller is None:
+            controller = PresentationController(
+                self.cam_width, self.cam_height, self.actions, self.clock,
+                zoom_controller=self.zoom_controller,
+                spotlight_controller=self.spotlight_controller,
+                cursor_interpolator=self.cursor_interpolator)
+            self.controllers[track_id] = controller
+        return controller
+
+    def handle_gestures(self, track_id, hand_sign_id, fingure_gesture_id,
+                        landmark_list, point_history):
+        self.controller(track_id).handle_gestures(
+            hand_sign_id, fingure_gesture_id, landmark_list, point_history)
+
+    def retain(self, track_ids):
+        """Forget the state of hands that are no longer tracked"""
+        for track_id in list(self.controllers):
+            if track_id not in track_ids:
+                self.controllers.pop(track_id).move_controller.reset()
+
+def tracked_point(hand_sign_id, landmark_list):
+    """Point to append to the point history for this frame.
+
+    The index finger is tracked for swipe/move/spotlight gestures, any other
+    hand sign adds a [0, 0] separator.
+    """
+    if hand_sign_id in [THREE_FINGER_ID, TWO_FINGER_ID, POINTING_ID]:
+        return [int(landmark_list[8][0]), int(landmark_list[8][1])]
+    return [0, 0]
+
+def map_camera_to_screen(cam_x, cam_y, cam_width, cam_height, actions=None):
+    screen_width, screen_height = (actions or PyAutoGuiActions()).screen_size()
+    screen_x = int(cam_x / cam_width * screen_width)
+    screen_y = int(cam_y / cam_height * screen_height)
+    return (screen_x, screen_y)
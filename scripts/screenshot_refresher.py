@@ -0,0 +1,106 @@
+import threading
+
+
+def fingerprint(screenshot, size=(160, 90)):
+    """Hash of a sparse grid of pixels, to spot unchanged screenshots cheaply"""
+    height, width = screenshot.shape[:2]
+    step_y = max(height // size[1], 1)
+    step_x = max(width // size[0], 1)
+    return hash(screenshot[::step_y, ::step_x].tobytes())
+
+
+class ScreenshotRefresher:
+    """Keeps a dimmed screenshot ready for the spotlight, on its own thread.
+
+    Every `interval` seconds it calls grab(). A capture whose fingerprint
+    matches the previous one is dropped before dimming. Otherwise the
+    renderer prepares it into the back buffer set and it is published; the
+    frame loop picks it up with take() or latest(), which only swap
+    references. There are two buffer sets, and the one the frame loop uses
+    is never written.
+
+    pause() stops capturing, e.g. while the spotlight overlay covers the
+    screen: a screenshot would only show the overlay itself.
+    """
+    def __init__(self, grab, renderer, interval=1.0, hash_size=(160, 90)):
+        self.grab = grab
+        self.renderer = renderer
+        self.interval = interval
+        self.hash_size = hash_size
+        self.captures = 0
+        self.unchanged = 0
+        self.refreshed = 0
+
+        self._lock = threading.Lock()
+        self._front = None  # Buffer set handed to the frame loop
+        self._pending = None  # Published, not taken yet
+        self._spare = None
+        self._fingerprint = None
+        self._paused = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='screenshot', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def pause(self):
+        self._paused.set()
+
+    def resume(self):
+        self._paused.clear()
+
+    def take(self):
+        """Buffer set published since the last call, or None"""
+        with self._lock:
+            buffers, self._pending = self._pending, None
+            if buffers is not None:
+                self._spare, self._front = self._front, buffers
+            return buffers
+
+    def latest(self):
+        """Newest buffer set (taking it if it is new), None before the first
+        capture"""
+        return self.take() or self._front
+
+    def _back_buffers(self):
+        with self._lock:
+            # An untaken set is not in use, it can be overwritten
+            buffers, self._pending = self._pending, None
+            if buffers is None:
+                buffers, self._spare = self._spare, None
+            return buffers
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            if self._paused.is_set():
+                continue
+            try:
+                screenshot = self.grab()
+            except Exception as e:
+                print(f"Couldn't refresh the screenshot: {e}")
+                continue
+            self.captures += 1
+
+            screen_fingerprint = fingerprint(screenshot, self.hash_size)
+            if screen_fingerprint == self._fingerprint:
+                self.unchanged += 1
+                continue
+            # Re-check: the overlay may have appeared during the grab
+            if self._paused.is_set():
+                continue
+            buffers = self.renderer.prepare(screenshot, self._back_buffers())
+            with self._lock:
+                self._pending = buffers
+            self._fingerprint = screen_fingerprint
+            self.refreshed += 1
+
+    def stats(self):
+        return {'captures': self.captures, 'unchanged': self.unchanged,
+                'refreshed': self.refreshed}
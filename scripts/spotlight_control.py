@@ -1,201 +1,111 @@
-import cv2
-import numpy as np
-import pyautogui
-import time
-import subprocess
-import platform
 import sys
 
+from scripts.actions import PyAutoGuiActions
+from scripts.screenshot_refresher import ScreenshotRefresher
+from scripts.spotlight_renderer import SpotlightRenderer
+from scripts.window_focus import WindowFocusTracker
+from utils.clock import SystemClock
+
 class SpotlightController:
-    def __init__(self):
+    def __init__(self, actions=None, clock=None, window_tracker=None):
+        self.actions = actions or PyAutoGuiActions()
+        self.clock = clock or SystemClock()
         self.overlay_window_name = "Spotlight"
         self.enabled = False
         self.screenshot = None
         self.spotlight_radius = 200
+        self.renderer = SpotlightRenderer(alpha=0.3)
+        self.refresher = None  # Optional ScreenshotRefresher
         self.last_update_time = 0
         self.update_cooldown = 1.0
         self.original_window_info = None
-        self.os_type = platform.system()
-        
-        # Print OS information
-        os_info = {
-            'Darwin': 'macOS',
-            'Windows': 'Windows',
-            'Linux': 'Linux'
-        }.get(self.os_type, self.os_type)
-        print("----")
-        print(f"🖥️ Operating System: {os_info}")
-        
-        # Platform-specific initialization
-        if self.os_type == 'Darwin':  # macOS
-            print("🔧 Using macOS window management")
-            print("----")
-            self.get_window_info = self._get_mac_window_info
-            self.restore_window = self._restore_mac_window
-        elif self.os_type == 'Windows':
-            print("🔧 Using Windows window management")
-            print("----")
-            self.get_window_info = self._get_win_window_info
-            self.restore_window = self._restore_win_window
-        else:  # Linux/other
-            print("🔧 Using Linux/other window management")
-            print("----")
-            self.get_window_info = self._get_linux_window_info
-            self.restore_window = self._restore_linux_window
-    
-    def _get_mac_window_info(self):
-        """Get active window info on macOS"""
-        try:
-            script = """
-            tell application "System Events"
-                set frontApp to first application process whose frontmost is true
-                set frontAppName to name of frontApp
-                try
-                    tell process frontAppName
-                        set windowName to name of first window
-                    end tell
-                    return frontAppName & "|||" & windowName
-                on error
-                    return frontAppName
-                end try
-            end tell
-            """
-            result = subprocess.run(['osascript', '-e', script], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                output = result.stdout.strip()
-                if "|||" in output:
-                    return output.split("|||")
-                return (output, None)
-        except Exception as e:
-            print(f"Couldn't get macOS window info: {e}")
-        return (None, None)
+        self._screenshot_job = None  # Future of a screenshot being taken
+        # The window backend is picked on first use, nothing to probe at startup
+        self.window_tracker = window_tracker or WindowFocusTracker(clock=self.clock)
 
-    def _get_win_window_info(self):
-        """Get active window info on Windows"""
-        try:
-            import win32gui
-            window = win32gui.GetForegroundWindow()
-            title = win32gui.GetWindowText(window)
-            exe_name = None
-            
-            # Try to get the executable name
-            try:
-                import psutil
-                pid = win32gui.GetWindowThreadProcessId(window)[1]
-                exe_name = psutil.Process(pid).name()
-            except:
-                pass
-                
-            return (exe_name or "unknown", title or "unknown")
-        except Exception as e:
-            print(f"Couldn't get Windows window info: {e}")
-        return (None, None)
+    def get_window_info(self):
+        return self.window_tracker.active_window()
 
-    def _get_linux_window_info(self):
-        """Get active window info on Linux"""
-        try:
-            # Try using xdotool if available
-            try:
-                id_result = subprocess.run(['xdotool', 'getactivewindow'], 
-                                        capture_output=True, text=True)
-                if id_result.returncode == 0:
-                    window_id = id_result.stdout.strip()
-                    name_result = subprocess.run(['xdotool', 'getwindowname', window_id],
-                                                capture_output=True, text=True)
-                    if name_result.returncode == 0:
-                        return ("unknown", name_result.stdout.strip())
-            except:
-                pass
-        except Exception as e:
-            print(f"Couldn't get Linux window info: {e}")
-        return (None, None)
+    def restore_window(self, app_name, window_name):
+        return self.window_tracker.restore(app_name, window_name)
 
-    def _restore_mac_window(self, app_name, window_name):
-        """Restore window on macOS"""
-        try:
-            if window_name:
-                script = f"""
-                tell application "{app_name}"
-                    activate
-                    try
-                        set targetWindow to window "{window_name}"
-                        set index of targetWindow to 1
-                    on error
-                        activate
-                    end try
-                end tell
-                """
-            else:
-                script = f'tell application "{app_name}" to activate'
-            
-            subprocess.run(['osascript', '-e', script])
-            return True
-        except Exception as e:
-            print(f"Couldn't restore macOS window: {e}")
-        return False
-
-    def _restore_win_window(self, app_name, window_title):
-        """Restore window on Windows"""
-        try:
-            import win32gui
-            import win32con
-            
-            def callback(hwnd, extra):
-                if window_title.lower() in win32gui.GetWindowText(hwnd).lower():
-                    extra.append(hwnd)
-                return True
-                
-            windows = []
-            win32gui.EnumWindows(callback, windows)
-            
-            if windows:
-                hwnd = windows[0]
-                win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-                win32gui.SetForegroundWindow(hwnd)
-
-                # Small delay to ensure window is focused
-                time.sleep(0.5)
-                
-                return True
-        except Exception as e:
-            print(f"Couldn't restore Windows window: {e}")
-        return False
-
-    def _restore_linux_window(self, app_name, window_title):
-        """Restore window on Linux"""
-        try:
-            # Try using wmctrl if available
+    def _grab_screen(self, screenshot=None, window_info=None):
+        """(active window info, screenshot), runs as an action job. Only
+        does the parts that are not known yet"""
+        if window_info is None:
             try:
-                subprocess.run(['wmctrl', '-a', window_title])
-                return True
-            except:
-                pass
-        except Exception as e:
-            print(f"Couldn't restore Linux window: {e}")
-        return False
+                window_info = self.get_window_info()
+            except Exception as e:
+                print(f"Couldn't get active window: {e}")
+                window_info = (None, None)
+        if screenshot is None:
+            screenshot = self.actions.screenshot()
+        return window_info, screenshot
+
+    def start_background_refresh(self, interval):
+        """Keep a dimmed screenshot ready in the background, so turning the
+        spotlight on does not wait for a capture"""
+        self.refresher = ScreenshotRefresher(self.actions.screenshot, self.renderer,
+                                             interval).start()
+        return self.refresher
+
+    def start_window_tracking(self, poll_interval):
+        """Look up the foreground window in the background, so turning the
+        spotlight on reads it from the cache"""
+        self.window_tracker.poll_interval = poll_interval
+        # One missed poll does not expire the cache
+        self.window_tracker.ttl = 2 * poll_interval
+        return self.window_tracker.start()
 
     def take_screenshot(self):
-        """Capture the current screen and store it"""
-        try:
-            self.original_window_info = self.get_window_info()
-            if self.original_window_info[0]:
-                print(f"Original window: {self.original_window_info[0]} - {self.original_window_info[1] or ''}")
+        """Capture the current screen and store it (on the action thread
+        when the actions go through an ActionDispatcher)"""
+        # The overlay is about to cover the screen and take the focus
+        self.original_window_info = None
+        window_info = self.window_tracker.cached()
+        self.window_tracker.pause()
+        buffers = None
+        if self.refresher is not None:
+            self.refresher.pause()
+            buffers = self.refresher.latest()
+
+        if buffers is not None:
+            # Captured and dimmed already
+            self.screenshot = buffers[0]
+            self.renderer.use(buffers)
+            if window_info is not None:
+                self._set_original_window(window_info)
             else:
-                print("Couldn't get window info")
-        except Exception as e:
-            print(f"Couldn't get active window: {e}")
-            self.original_window_info = (None, None)
-
-        screen = pyautogui.screenshot()
-        screen_width, screen_height = pyautogui.size()
-        screen = screen.resize((screen_width, screen_height))
-        self.screenshot = cv2.cvtColor(np.array(screen), cv2.COLOR_RGB2BGR)
-        self.last_update_time = time.time()
+                self._screenshot_job = self.actions.submit('window_info', self._grab_screen,
+                                                           buffers[0])
+        else:
+            self._screenshot_job = self.actions.submit('screenshot', self._grab_screen,
+                                                       None, window_info)
+        self.last_update_time = self.clock.time()
+        self._collect_screenshot()
+
+    def _set_original_window(self, window_info):
+        self.original_window_info = window_info
+        if window_info[0]:
+            print(f"Original window: {window_info[0]} - {window_info[1] or ''}")
+        else:
+            print("Couldn't get window info")
+
+    def _collect_screenshot(self):
+        """Take over a finished screenshot job, False while none is ready"""
+        job = self._screenshot_job
+        if job is not None and job.done():
+            self._screenshot_job = None
+            window_info, screenshot = job.result()
+            self._set_original_window(window_info)
+            if screenshot is not self.screenshot:
+                self.screenshot = screenshot
+                self.renderer.set_screenshot(screenshot)
+        return self.screenshot is not None
 
     def refresh_screenshot(self):
         """Force a screenshot refresh if cooldown has passed"""
-        current_time = time.time()
+        current_time = self.clock.time()
         if current_time - self.last_update_time > self.update_cooldown:
             self.take_screenshot()
             return True
@@ -203,59 +113,57 @@ class SpotlightController:
 
     def show_spotlight(self, finger_pos, force_refresh=False):
         """Show spotlight at finger position"""
-        if force_refresh or self.screenshot is None:
+        if force_refresh or (self.screenshot is None and self._screenshot_job is None):
             self.take_screenshot()
-        
-        base = self.screenshot.copy()
-        h, w, _ = base.shape
-
-        # Create dark overlay
-        dark_overlay = base.copy()
-        dark_overlay[:] = (0, 0, 0)
-        alpha = 0.3
-
-        # Create circular mask
-        mask = np.zeros((h, w), dtype=np.uint8)
-        cv2.circle(mask, finger_pos, self.spotlight_radius, 255, -1)
-        mask_3d = cv2.merge([mask] * 3)
+        self.enabled = True
+        # Until the first screenshot arrives there is nothing to draw on
+        if not self._collect_screenshot():
+            return
 
-        # Blend only non-spotlight regions
-        inv_mask = cv2.bitwise_not(mask_3d)
-        darkened = cv2.addWeighted(base, alpha, dark_overlay, 1 - alpha, 0)
-        spotlight = cv2.bitwise_and(base, mask_3d)
-        dimmed = cv2.bitwise_and(darkened, inv_mask)
-        final = cv2.add(spotlight, dimmed)
+        # Dimmed once per screenshot, only the spotlight area changes per frame
+        final = self.renderer.render(finger_pos, self.spotlight_radius)
 
-        cv2.namedWindow(self.overlay_window_name, cv2.WND_PROP_FULLSCREEN)
-        cv2.setWindowProperty(self.overlay_window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-        cv2.imshow(self.overlay_window_name, final)
-        cv2.setWindowProperty(self.overlay_window_name, cv2.WND_PROP_TOPMOST, 1)
-        self.enabled = True
+        self.actions.show_overlay(self.overlay_window_name, final)
 
     def hide_spotlight(self):
         """Hide the spotlight overlay and restore original window"""
         if self.enabled:
-            cv2.destroyWindow(self.overlay_window_name)
+            self.actions.hide_overlay(self.overlay_window_name)
             self.enabled = False
             self.screenshot = None
-
-            # Restore the original window after a small delay
-            time.sleep(0.3)
-
-            if self.original_window_info and self.original_window_info[0]:
-                app_name, window_name = self.original_window_info
-                success = self.restore_window(app_name, window_name)
-                if success:
-                    print(f"Restored focus to: {app_name}" + 
-                        (f" - {window_name}" if window_name else ""))
-
-                    # Give some time for window to properly regain focus
-                    time.sleep(0.5)
-
-                    # # Optional: simulate click to help focus
-                    # screen_width, screen_height = pyautogui.size()
-                    # pyautogui.click(screen_width // 2, screen_height // 2)
-                else:
-                    print("Failed to restore window focus")
+            # A lookup still in flight runs before the restore job
+            window_job, self._screenshot_job = self._screenshot_job, None
+            self.renderer.reset()
+            if self.refresher is not None:
+                self.refresher.resume()
+            self.window_tracker.resume()
+
+            # The sleeps around the focus change run as an action job, so
+            # they do not hold up the frame loop
+            self.actions.submit('restore_window', self._restore_original_window,
+                                self.original_window_info, window_job)
+
+    def _restore_original_window(self, window_info, window_job=None):
+        if window_job is not None:
+            window_info = window_job.result()[0]
+
+        # Restore the original window after a small delay
+        self.clock.sleep(0.3)
+
+        if window_info and window_info[0]:
+            app_name, window_name = window_info
+            success = self.restore_window(app_name, window_name)
+            if success:
+                print(f"Restored focus to: {app_name}" +
+                    (f" - {window_name}" if window_name else ""))
+
+                # Give some time for window to properly regain focus
+                self.clock.sleep(0.5)
+
+                # # Optional: simulate click to help focus
+                # screen_width, screen_height = pyautogui.size()
+                # pyautogui.click(screen_width // 2, screen_height // 2)
             else:
-                print("No original window to restore")
\ No newline at end of file
+                print("Failed to restore window focus")
+        else:
+            print("No original window to restore")
@@ -0,0 +1,87 @@
+import cv2
+import numpy as np
+
+
+class SpotlightRenderer:
+    """Builds spotlight frames from one screenshot, patching only what moved.
+
+    The dimmed copy of the screenshot is computed once per screenshot. Each
+    frame then only restores the dimmed pixels under the previous spotlight
+    and copies the bright ones under the new one, through a cached circular
+    mask sprite, so the per-frame cost depends on the spotlight size instead
+    of the screen resolution. The output is identical to dimming and masking
+    the whole screen every frame.
+    """
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.screenshot = None
+        self.dimmed = None
+        self.frame = None
+        self._rect = None  # (x1, y1, x2, y2) of the spotlight currently in frame
+        self._own_buffers = None  # Reused by set_screenshot()
+        self._sprites = {}  # radius -> (2r+1, 2r+1) uint8 mask
+
+    def prepare(self, screenshot, buffers=None):
+        """(screenshot, dimmed, frame) ready for use(), reusing the arrays of
+        `buffers` when the size matches. Does not touch the renderer's state,
+        so it can run on another thread."""
+        if buffers is None or buffers[1].shape != screenshot.shape:
+            dimmed = np.empty_like(screenshot)
+            frame = np.empty_like(screenshot)
+        else:
+            _, dimmed, frame = buffers
+        # Same rounding as blending with a black image
+        cv2.addWeighted(screenshot, self.alpha, screenshot, 0.0, 0, dst=dimmed)
+        np.copyto(frame, dimmed)
+        return (screenshot, dimmed, frame)
+
+    def use(self, buffers):
+        """Switch to buffers from prepare(), only swaps references"""
+        self.screenshot, self.dimmed, self.frame = buffers
+        self._rect = None
+
+    def set_screenshot(self, screenshot):
+        """Use a new screenshot, dims it once"""
+        self._own_buffers = self.prepare(screenshot, self._own_buffers)
+        self.use(self._own_buffers)
+
+    def reset(self):
+        """Erase the spotlight, so the buffers can be used again, and let go
+        of them"""
+        if self._rect is not None:
+            x1, y1, x2, y2 = self._rect
+            self.frame[y1:y2, x1:x2] = self.dimmed[y1:y2, x1:x2]
+        self.screenshot = self.dimmed = self.frame = None
+        self._own_buffers = None
+        self._rect = None
+
+    def _sprite(self, radius):
+        sprite = self._sprites.get(radius)
+        if sprite is None:
+            size = 2 * radius + 1
+            mask = np.zeros((size, size), dtype=np.uint8)
+            cv2.circle(mask, (radius, radius), radius, 255, -1)
+            sprite = self._sprites[radius] = mask
+        return sprite
+
+    def render(self, center, radius):
+        """The spotlight frame with the circle at `center`, (x, y) in screen
+        pixels. Returns an internal buffer, valid until the next call."""
+        height, width = self.frame.shape[:2]
+        x, y = int(center[0]), int(center[1])
+        x1, y1 = max(x - radius, 0), max(y - radius, 0)
+        x2, y2 = min(x + radius + 1, width), min(y + radius + 1, height)
+
+        if self._rect is not None:
+            ox1, oy1, ox2, oy2 = self._rect
+            self.frame[oy1:oy2, ox1:ox2] = self.dimmed[oy1:oy2, ox1:ox2]
+
+        if x1 < x2 and y1 < y2:
+            sprite = self._sprite(radius)[y1 - (y - radius):y2 - (y - radius),
+                                          x1 - (x - radius):x2 - (x - radius)]
+            # Writes through the view into frame
+            cv2.copyTo(self.screenshot[y1:y2, x1:x2], sprite, self.frame[y1:y2, x1:x2])
+            self._rect = (x1, y1, x2, y2)
+        else:
+            self._rect = None
+        return self.frame
@@ -1,10 +1,14 @@
+import numpy as np
+
+
 def detect_swipe(point_history, threshold=150, min_frames=4, return_sensitivity=0.6):
 
     """
     Detects horizontal swipe direction from a sequence of finger positions.
     
     Args:
-        point_history: List of (x,y) finger positions
+        point_history: (N, 2) array (e.g. PointHistory.points()) or list of
+            (x,y) finger positions
         threshold: Minimum swipe distance in pixels
         min_frames: Minimum consecutive frames to consider
         return_sensitivity: How much return movement cancels swipe (0-1)
@@ -15,29 +19,35 @@ def detect_swipe(point_history, threshold=150, min_frames=4, return_sensitivity=
         None if no clear swipe is detected
     """
     
+    # One conversion of the (usually 16 x 2) buffer, plain Python is faster
+    # than NumPy calls on arrays this small
+    if isinstance(point_history, np.ndarray):
+        point_history = point_history.tolist()
+
     # Filter out any [0, 0] placeholder points (added when no gesture is active)
     # These zero points act as separators between distinct gestures
     valid_points = [p for p in point_history if p != [0, 0]]
-    
+
     # Check if we have enough valid points after filtering
     if len(valid_points) < min_frames:
         return None
-    
+
     # Find the peak extent point (furthest from start)
-    start_point = valid_points[0]
-    peak_point = start_point
+    start_x, start_y = valid_points[0]
+    peak_index = 0
     max_distance = 0
 
-    for point in valid_points:
-        current_dist = abs(point[0] - start_point[0])
+    for index, point in enumerate(valid_points):
+        current_dist = abs(point[0] - start_x)
         if current_dist > max_distance:
             max_distance = current_dist
-            peak_point = point
-    
+            peak_index = index
+    peak_point = valid_points[peak_index]
+
     # Calculate movement to peak point (not end point)
-    x_diff = peak_point[0] - start_point[0]
-    y_diff = peak_point[1] - start_point[1]
-    
+    x_diff = peak_point[0] - start_x
+    y_diff = peak_point[1] - start_y
+
     # Check if primary movement was horizontal
     if abs(x_diff) <= abs(y_diff):
         return None
@@ -45,18 +55,18 @@ def detect_swipe(point_history, threshold=150, min_frames=4, return_sensitivity=
     # Check if movement exceeds threshold
     if abs(x_diff) < threshold:
         return None
-    
+
     # Verify consistent direction to peak point
     direction = 1 if x_diff > 0 else -1
-    for i in range(1, valid_points.index(peak_point)):
+    for i in range(1, peak_index):
         dx = valid_points[i][0] - valid_points[i-1][0]
         if (dx * direction) < 0:  # Direction change
             return None
-    
+
     # Check if hand returned too much (cancel swipe if returned beyond sensitivity)
-    if len(valid_points) > valid_points.index(peak_point) + 1:
+    if len(valid_points) > peak_index + 1:
         return_dist = abs(valid_points[-1][0] - peak_point[0])
         if return_dist > (abs(x_diff) * return_sensitivity):
             return None
-    
-    return "right" if x_diff > 0 else "left"
\ No newline at end of file
+
+    return "right" if x_diff > 0 else "left"
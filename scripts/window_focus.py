@@ -0,0 +1,309 @@
+import platform
+import subprocess
+import threading
+
+from utils.clock import SystemClock
+
+
+class MacWindowBackend:
+    """Foreground window lookup and restore through AppleScript"""
+    def __init__(self, clock=None):
+        self.clock = clock or SystemClock()
+
+    def active_window(self):
+        """Get active window info on macOS"""
+        try:
+            script = """
+            tell application "System Events"
+                set frontApp to first application process whose frontmost is true
+                set frontAppName to name of frontApp
+                try
+                    tell process frontAppName
+                        set windowName to name of first window
+                    end tell
+                    return frontAppName & "|||" & windowName
+                on error
+                    return frontAppName
+                end try
+            end tell
+            """
+            result = subprocess.run(['osascript', '-e', script],
+                                  capture_output=True, text=True)
+            if result.returncode == 0:
+                output = result.stdout.strip()
+                if "|||" in output:
+                    return tuple(output.split("|||"))
+                return (output, None)
+        except Exception as e:
+            print(f"Couldn't get macOS window info: {e}")
+        return (None, None)
+
+    def restore(self, app_name, window_name):
+        """Restore window on macOS"""
+        try:
+            if window_name:
+                script = f"""
+                tell application "{app_name}"
+                    activate
+                    try
+                        set targetWindow to window "{window_name}"
+                        set index of targetWindow to 1
+                    on error
+                        activate
+                    end try
+                end tell
+                """
+            else:
+                script = f'tell application "{app_name}" to activate'
+
+            subprocess.run(['osascript', '-e', script])
+            return True
+        except Exception as e:
+            print(f"Couldn't restore macOS window: {e}")
+        return False
+
+
+class WindowsWindowBackend:
+    """Foreground window lookup and restore through pywin32"""
+    def __init__(self, clock=None):
+        self.clock = clock or SystemClock()
+
+    def active_window(self):
+        """Get active window info on Windows"""
+        try:
+            import win32gui
+            window = win32gui.GetForegroundWindow()
+            title = win32gui.GetWindowText(window)
+            exe_name = None
+
+            # Try to get the executable name
+            try:
+                import psutil
+                pid = win32gui.GetWindowThreadProcessId(window)[1]
+                exe_name = psutil.Process(pid).name()
+            except:
+                pass
+
+            return (exe_name or "unknown", title or "unknown")
+        except Exception as e:
+            print(f"Couldn't get Windows window info: {e}")
+        return (None, None)
+
+    def restore(self, app_name, window_title):
+        """Restore window on Windows"""
+        try:
+            import win32gui
+            import win32con
+
+            def callback(hwnd, extra):
+                if window_title.lower() in win32gui.GetWindowText(hwnd).lower():
+                    extra.append(hwnd)
+                return True
+
+            windows = []
+            win32gui.EnumWindows(callback, windows)
+
+            if windows:
+                hwnd = windows[0]
+                win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+                win32gui.SetForegroundWindow(hwnd)
+
+                # Small delay to ensure window is focused
+                self.clock.sleep(0.5)
+
+                return True
+        except Exception as e:
+            print(f"Couldn't restore Windows window: {e}")
+        return False
+
+
+class LinuxWindowBackend:
+    """Foreground window lookup through xdotool, restore through wmctrl"""
+    def __init__(self, clock=None):
+        self.clock = clock or SystemClock()
+
+    def active_window(self):
+        """Get active window info on Linux"""
+        try:
+            # Try using xdotool if available
+            try:
+                id_result = subprocess.run(['xdotool', 'getactivewindow'],
+                                        capture_output=True, text=True)
+                if id_result.returncode == 0:
+                    window_id = id_result.stdout.strip()
+                    name_result = subprocess.run(['xdotool', 'getwindowname', window_id],
+                                                capture_output=True, text=True)
+                    if name_result.returncode == 0:
+                        return ("unknown", name_result.stdout.strip())
+            except:
+                pass
+        except Exception as e:
+            print(f"Couldn't get Linux window info: {e}")
+        return (None, None)
+
+    def restore(self, app_name, window_title):
+        """Restore window on Linux"""
+        try:
+            # Try using wmctrl if available
+            try:
+                subprocess.run(['wmctrl', '-a', window_title])
+                return True
+            except:
+                pass
+        except Exception as e:
+            print(f"Couldn't restore Linux window: {e}")
+        return False
+
+
+class FakeWindowBackend:
+    """Window backend that never touches the desktop, for replays and tests.
+
+    active_window() returns `window`; restores are recorded in `restored`
+    and make the restored window the active one.
+    """
+    def __init__(self, window=('Slides', 'Presentation')):
+        self.window = tuple(window)
+        self.lookups = 0
+        self.restored = []
+
+    def active_window(self):
+        self.lookups += 1
+        return self.window
+
+    def restore(self, app_name, window_name):
+        self.restored.append((app_name, window_name))
+        self.window = (app_name, window_name)
+        return True
+
+
+def default_backend(clock=None):
+    """Window backend for this OS"""
+    os_type = platform.system()
+
+    # Print OS information
+    os_info = {
+        'Darwin': 'macOS',
+        'Windows': 'Windows',
+        'Linux': 'Linux'
+    }.get(os_type, os_type)
+    print("----")
+    print(f"🖥️ Operating System: {os_info}")
+
+    # Platform-specific initialization
+    if os_type == 'Darwin':  # macOS
+        print("🔧 Using macOS window management")
+        print("----")
+        return MacWindowBackend(clock)
+    elif os_type == 'Windows':
+        print("🔧 Using Windows window management")
+        print("----")
+        return WindowsWindowBackend(clock)
+    else:  # Linux/other
+        print("🔧 Using Linux/other window management")
+        print("----")
+        return LinuxWindowBackend(clock)
+
+
+class WindowFocusTracker:
+    """Foreground window, looked up in the background and cached.
+
+    Every lookup goes through `backend` (picked for this OS on first use if
+    not given) and is cached for `ttl` seconds. With start(), a thread
+    refreshes the cache every poll_interval seconds, so cached() usually
+    has an answer without starting a subprocess. pause() stops polling,
+    e.g. while our own overlay is the foreground window.
+    """
+    def __init__(self, backend=None, ttl=2.0, poll_interval=1.0, clock=None):
+        self.clock = clock or SystemClock()
+        self._backend = backend
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.lookups = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        self._lock = threading.Lock()
+        self._window = None
+        self._window_time = None
+        self._paused = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = default_backend(self.clock)
+        return self._backend
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='window-focus', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def pause(self):
+        self._paused.set()
+
+    def resume(self):
+        self._paused.clear()
+
+    def cached(self):
+        """Cached (app name, window name) if younger than ttl, else None"""
+        with self._lock:
+            if self._window_time is not None and \
+                    self.clock.time() - self._window_time <= self.ttl:
+                self.cache_hits += 1
+                return self._window
+            self.cache_misses += 1
+            return None
+
+    def active_window(self):
+        """(app name, window name) of the foreground window, from the cache
+        when it is fresh. Blocks on the backend otherwise"""
+        window = self.cached()
+        if window is None:
+            window = self.lookup()
+        return window
+
+    def lookup(self):
+        """Ask the backend now and cache the answer"""
+        window = tuple(self.backend.active_window())
+        self.lookups += 1
+        with self._lock:
+            self._window = window
+            self._window_time = self.clock.time()
+        return window
+
+    def restore(self, app_name, window_name):
+        success = self.backend.restore(app_name, window_name)
+        if success:
+            # Whatever was cached is no longer in front
+            with self._lock:
+                self._window_time = None
+        return success
+
+    def _run(self):
+        while not self._stop_event.wait(self.poll_interval):
+            if self._paused.is_set():
+                continue
+            try:
+                window = tuple(self.backend.active_window())
+            except Exception as e:
+                print(f"Couldn't get active window: {e}")
+                continue
+            # Looked up before a pause() that came in meanwhile: the overlay
+            # may already be in front
+            if self._paused.is_set():
+                continue
+            self.lookups += 1
+            with self._lock:
+                self._window = window
+                self._window_time = self.clock.time()
+
+    def stats(self):
+        return {'lookups': self.lookups, 'cache_hits': self.cache_hits,
+                'cache_misses': self.cache_misses}
@@ -1,22 +1,24 @@
-import time
-import pyautogui
+from scripts.actions import PyAutoGuiActions
+from utils.clock import SystemClock
 
 class ZoomController:
-    def __init__(self):
+    def __init__(self, actions=None, clock=None):
+        self.actions = actions or PyAutoGuiActions()
+        self.clock = clock or SystemClock()
         self.last_zoom_time = 0
         self.zoom_cooldown = 1.0  # seconds
     
     def zoom(self, direction):
         """Zoom in or out based on direction: 'in' or 'out'"""
-        current_time = time.time()
+        current_time = self.clock.time()
         if current_time - self.last_zoom_time < self.zoom_cooldown:
             return  # Prevent rapid zooming
         
         if direction == "in":
-            pyautogui.hotkey('command', '+')
+            self.actions.hotkey('command', '+')
             print("Zoomed In")
         elif direction == "out":
-            pyautogui.hotkey('command', '-')
+            self.actions.hotkey('command', '-')
             print("Zoomed Out")
         
-        self.last_zoom_time = current_time
+        self.last_zoom_time = current_time
\ No newline at end of file
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Run several cameras (presenters) from one process tree.
+
+Every --device gets its own worker process that captures, detects and
+classifies hands exactly like app.py, headless. Workers only send the
+per-hand results back; this process owns the screen: it runs the gesture
+controllers for every source and sends their keyboard/mouse actions through
+one dispatcher, which applies the per-source routing rules.
+
+    python3 supervisor.py --device 0 --device 1 --route 0=slides,spotlight --route 1=zoom,move
+
+Action groups for --route: slides (arrow keys), zoom (zoom hotkeys), move
+(mouse moves), spotlight (screenshots, overlay and window focus). Sources
+without a rule may do everything. The model files are only read, so the OS
+shares their pages between the workers.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future
+
+ACTION_GROUPS = ('slides', 'zoom', 'move', 'spotlight')
+
+# Which group each action sink call belongs to
+_ACTION_GROUP = {
+    'press': 'slides',
+    'hotkey': 'zoom',
+    'move_rel': 'move',
+    'screenshot': 'spotlight',
+    'show_overlay': 'spotlight',
+    'hide_overlay': 'spotlight',
+    # submit() jobs
+    'window_info': 'spotlight',
+    'restore_window': 'spotlight',
+}
+
+
+class RoutedActions(object):
+    """Action sink for one source, forwarding only what its rule allows"""
+    def __init__(self, actions, source, allowed_groups):
+        self.actions = actions
+        self.source = source
+        self.allowed_groups = set(allowed_groups)
+        self.forwarded = 0
+        self.blocked = 0
+
+    def _allowed(self, action):
+        if _ACTION_GROUP[action] in self.allowed_groups:
+            self.forwarded += 1
+            return True
+        self.blocked += 1
+        return False
+
+    def press(self, key):
+        if self._allowed('press'):
+            self.actions.press(key)
+
+    def hotkey(self, *keys):
+        if self._allowed('hotkey'):
+            self.actions.hotkey(*keys)
+
+    def move_rel(self, dx, dy):
+        if self._allowed('move_rel'):
+            self.actions.move_rel(dx, dy)
+
+    def screen_size(self):
+        return self.actions.screen_size()
+
+    def screenshot(self):
+        if self._allowed('screenshot'):
+            return self.actions.screenshot()
+        return None
+
+    def show_overlay(self, window_name, image):
+        if self._allowed('show_overlay'):
+            self.actions.show_overlay(f'{window_name} ({self.source})', image)
+
+    def hide_overlay(self, window_name):
+        if self._allowed('hide_overlay'):
+            self.actions.hide_overlay(f'{window_name} ({self.source})')
+
+    def submit(self, name, fn, *args):
+        if name in _ACTION_GROUP and not self._allowed(name):
+            # Blocked jobs do not run at all, e.g. no focus change
+            future = Future()
+            future.set_result(None)
+            return future
+        return self.actions.submit(name, fn, *args)
+
+
+class BlockedSpotlight(object):
+    """Spotlight of a source whose route excludes it.
+
+    Takes no screenshots, shows no overlay and never touches the window
+    focus; pointing gestures are only counted as blocked.
+    """
+    enabled = False
+
+    def __init__(self, routed_actions):
+        self.routed_actions = routed_actions
+
+    def show_spotlight(self, finger_pos, force_refresh=False):
+        self.routed_actions._allowed('show_overlay')
+
+    def hide_spotlight(self):
+        pass
+
+    def refresh_screenshot(self):
+        return False
+
+
+def parse_routes(routes, sources):
+    """['0=slides,zoom', ...] -> {source: set of groups}"""
+    rules = {source: set(ACTION_GROUPS) for source in sources}
+    for route in routes:
+        source, _, groups = route.partition('=')
+        if source not in rules:
+            raise SystemExit(f'--route {route}: no --device {source}')
+        groups = {group for group in groups.split(',') if group}
+        unknown = groups - set(ACTION_GROUPS)
+        if unknown:
+            raise SystemExit(f'--route {route}: unknown action group(s) {sorted(unknown)}')
+        rules[source] = groups
+    return rules
+
+
+#*************************************************************************************************************#
+# Worker process
+
+def camera_worker(source, device, args, results, hand_results_queue, stop_event):
+    """Capture, detect and classify one camera, send hand results upstream.
+
+    Messages put on `results` (a multiprocessing queue shared by all
+    cameras):
+        ('ready', source, width, height)
+        ('stats', source, {...})
+        ('error', source, message)
+    and on `hand_results_queue` (a small bounded queue of this camera only):
+        ('hands', source, timestamp, track_ids, [(track_id, hand_sign_id,
+            finger_gesture_id, landmark_list, point_history), ...])
+    When the dispatcher falls behind, the oldest hand result is dropped to
+    make room for the newest, stale gestures are worse than missing ones.
+    """
+    # Workers handle shutdown through stop_event only
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        import cv2 as cv
+
+        import app
+        from utils import (FrameCapture, FramePipeline, HandDetector,
+                           DetectionScheduler, StageMetrics, StartupProfile)
+
+        profile = StartupProfile()
+        cap = cv.VideoCapture(device)
+        cap.set(cv.CAP_PROP_FRAME_WIDTH, args.width)
+        cap.set(cv.CAP_PROP_FRAME_HEIGHT, args.height)
+        width = int(cap.get(cv.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv.CAP_PROP_FRAME_HEIGHT))
+        capture = FrameCapture(cap, buffer_len=args.capture_buffer).start()
+
+        hands, keypoint_classifier, point_history_classifier = app.load_models(
+            args, width, height, profile)
+        metrics = StageMetrics()
+        detector = HandDetector(hands, roi=args.roi)
+        scheduler = None
+        if args.detect_every > 1:
+            scheduler = DetectionScheduler(max_interval=args.detect_every)
+        processor = app.FrameProcessor(capture, detector, keypoint_classifier,
+                                       point_history_classifier, metrics=metrics,
+                                       scheduler=scheduler,
+                                       sign_smoothing=args.sign_smoothing,
+                                       preview=False)
+        pipeline = FramePipeline(processor.capture, on_drop=processor.release)
+        pipeline.add_stage('detect', processor.detect)
+        pipeline.add_stage('classify', processor.classify)
+        pipeline.start()
+    except Exception as e:
+        results.put(('error', source, f'{type(e).__name__}: {e}'))
+        return
+
+    results.put(('ready', source, width, height))
+
+    frames = 0
+    dropped = 0
+    last_stats = time.perf_counter()
+    try:
+        while not stop_event.is_set():
+            try:
+                packet = pipeline.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if packet is None:
+                break
+            frames += 1
+            hand_results = [(hand.track_id, hand.hand_sign_id, hand.finger_gesture_id,
+                             hand.landmark_list, hand.point_history)
+                            for hand in packet.hands]
+            track_ids = list(packet.track_ids)
+            timestamp = packet.timestamp
+            processor.release(packet)
+            message = ('hands', source, timestamp, track_ids, hand_results)
+            try:
+                hand_results_queue.put_nowait(message)
+            except queue.Full:
+                # Make room by dropping this camera's stalest result. Not
+                # get_nowait(): results this process put may still sit in
+                # the queue's feeder thread instead of the pipe
+                try:
+                    hand_results_queue.get(timeout=0.01)
+                except queue.Empty:
+                    pass
+                dropped += 1
+                try:
+                    hand_results_queue.put_nowait(message)
+                except queue.Full:
+                    pass
+
+            now = time.perf_counter()
+            if now - last_stats >= 1.0:
+                capture_stats = capture.stats()
+                stages = metrics.snapshot()
+                stats = {
+                    'fps': frames / (now - last_stats),
+                    'frames_captured': capture_stats['captured'],
+                    'frames_dropped': capture_stats['dropped'],
+                    'results_dropped': dropped,
+                    'stage_p50_ms': {name: round(stage['p50'], 2)
+                                     for name, stage in stages.items()},
+                }
+                try:
+                    results.put_nowait(('stats', source, stats))
+                except queue.Full:
+                    pass
+                frames = 0
+                last_stats = now
+    finally:
+        pipeline.stop()
+        capture.release()
+
+
+#*************************************************************************************************************#
+# Dispatcher (this process)
+
+def get_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--device", help='camera device ID, repeat for every camera',
+                        type=int, action='append', required=True)
+    parser.add_argument("--width", help='cap width', type=int, default=960)
+    parser.add_argument("--height", help='cap height', type=int, default=540)
+    parser.add_argument("--capture_buffer", type=int, default=3)
+    parser.add_argument("--max_num_hands", type=int, default=1)
+    parser.add_argument('--use_static_image_mode', action='store_true')
+    parser.add_argument("--min_detection_confidence", type=float, default=0.7)
+    parser.add_argument("--min_tracking_confidence", type=float, default=0.5)
+    parser.add_argument('--roi', action='store_true')
+    parser.add_argument("--detect_every", type=int, default=1)
+    parser.add_argument("--sign_smoothing", type=int, default=5)
+    parser.add_argument("--classifier_backend", choices=['tflite', 'numpy'],
+                        default='tflite')
+    parser.add_argument("--classifier_precision",
+                        choices=['float32', 'float16', 'int8'], default='float32')
+    parser.add_argument("--route",
+                        help='SOURCE=GROUP[,GROUP...] actions a camera may trigger '
+                             f'({", ".join(ACTION_GROUPS)})',
+                        action='append', default=[])
+    parser.add_argument("--queue_size",
+                        help='max hand results of one camera waiting for the dispatcher, '
+                             'the oldest are dropped first',
+                        type=int, default=4)
+    parser.add_argument("--metrics_file",
+                        help='periodically write per-camera throughput as JSON',
+                        default=None)
+    parser.add_argument("--metrics_interval", type=float, default=5.0)
+
+    args = parser.parse_args()
+    if args.roi and not args.use_static_image_mode:
+        parser.error("--roi only helps with --use_static_image_mode")
+
+    return args
+
+
+def write_metrics(path, camera_metrics):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(camera_metrics, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def main():
+    args = get_args()
+    sources = [str(device) for device in args.device]
+    if len(set(sources)) != len(sources):
+        raise SystemExit('each --device may only be given once')
+    rules = parse_routes(args.route, sources)
+
+    # spawn: MediaPipe and the TFLite runtime start threads, which do not
+    # survive a fork
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    hand_results_queues = {source: context.Queue(maxsize=max(args.queue_size, 1))
+                           for source in sources}
+    stop_event = context.Event()
+    workers = []
+    for source, device in zip(sources, args.device):
+        worker = context.Process(target=camera_worker, name=f'camera-{source}',
+                                 args=(source, device, args, results,
+                                       hand_results_queues[source], stop_event),
+                                 daemon=True)
+        worker.start()
+        workers.append(worker)
+
+    # The dispatcher side: one real action sink, one controller set per source
+    import cv2 as cv
+
+    from scripts.actions import ActionDispatcher
+    from scripts.presentation_control import MultiHandController
+    from utils import StageMetrics
+
+    # All OS calls run on the dispatcher's thread, in the order they were made
+    actions = ActionDispatcher().start()
+    routed_actions = {}
+    controllers = {}
+    camera_metrics = {source: {'state': 'starting'} for source in sources}
+    latencies = {source: StageMetrics() for source in sources}
+
+    shutdown = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: shutdown.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: shutdown.set())
+
+    last_dump = time.perf_counter()
+    while not shutdown.is_set():
+        # Spotlight overlays are HighGUI windows owned by this thread
+        if any(controller.spotlight_controller.enabled for controller in controllers.values()):
+            cv.waitKey(1)
+
+        # Short wait, hand results arrive on the per-camera queues below
+        try:
+            message = results.get(timeout=0.005)
+        except queue.Empty:
+            message = None
+
+        if message is not None:
+            kind, source = message[0], message[1]
+            if kind == 'ready':
+                _, _, width, height = message
+                print(f"Camera {source} ready: {width}x{height}, "
+                      f"routes: {', '.join(sorted(rules[source])) or 'none'}")
+                routed_actions[source] = RoutedActions(actions, source, rules[source])
+                spotlight_controller = None
+                if 'spotlight' not in rules[source]:
+                    spotlight_controller = BlockedSpotlight(routed_actions[source])
+                controllers[source] = MultiHandController(
+                    width, height, actions=routed_actions[source],
+                    spotlight_controller=spotlight_controller)
+                camera_metrics[source]['state'] = 'running'
+            elif kind == 'stats':
+                camera_metrics[source].update(message[2])
+            elif kind == 'error':
+                camera_metrics[source]['state'] = 'failed'
+                print(f"Camera {source} failed: {message[2]}")
+
+        received = False
+        for source, hand_results_queue in hand_results_queues.items():
+            while True:
+                try:
+                    _, _, timestamp, track_ids, hand_results = hand_results_queue.get_nowait()
+                except queue.Empty:
+                    break
+                received = True
+                if source not in controllers:
+                    continue
+                controller = controllers[source]
+                controller.retain(track_ids)
+                start = time.perf_counter()
+                for track_id, hand_sign_id, finger_gesture_id, landmark_list, point_history \
+                        in hand_results:
+                    controller.handle_gestures(track_id, hand_sign_id, finger_gesture_id,
+                                               landmark_list, point_history)
+                latencies[source].record('handle_gestures', time.perf_counter() - start)
+                latencies[source].record('end_to_end', time.time() - timestamp)
+
+        if message is None and not received and \
+                not any(worker.is_alive() for worker in workers):
+            break
+
+        now = time.perf_counter()
+        if now - last_dump >= args.metrics_interval:
+            last_dump = now
+            for source in sources:
+                camera_metrics[source]['dispatch_ms'] = latencies[source].snapshot()
+                if source in routed_actions:
+                    camera_metrics[source]['actions_forwarded'] = routed_actions[source].forwarded
+                    camera_metrics[source]['actions_blocked'] = routed_actions[source].blocked
+            for source in sources:
+                stats = camera_metrics[source]
+                print(f"Camera {source}: {stats['state']}, {stats.get('fps', 0.0):.1f} FPS, "
+                      f"{stats.get('results_dropped', 0)} results dropped")
+            if args.metrics_file:
+                write_metrics(args.metrics_file, camera_metrics)
+
+    stop_event.set()
+    for worker in workers:
+        worker.join(timeout=5.0)
+        if worker.is_alive():
+            worker.terminate()
+    for controller in controllers.values():
+        if controller.spotlight_controller.enabled:
+            controller.spotlight_controller.hide_spotlight()
+    actions.stop()
+    print("Actions:", actions.stats())
+    cv.destroyAllWindows()
+    if args.metrics_file:
+        write_metrics(args.metrics_file, camera_metrics)
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,13 @@
-from utils.cvfpscalc import CvFpsCalc
\ No newline at end of file
+from utils.cvfpscalc import CvFpsCalc
+from utils.frame_capture import FrameCapture
+from utils.frame_pipeline import FramePipeline, StageQueue
+from utils.frame_buffers import FrameBufferPool
+from utils.session_recorder import SessionRecorder, SessionReader
+from utils.stage_metrics import LatencyHistogram, StageMetrics
+from utils.hand_detector import DetectedHand, HandDetector
+from utils.detection_scheduler import DetectionScheduler
+from utils.startup_profile import StartupProfile
+from utils.gesture_smoother import GestureSmoother
+from utils.point_history import PointHistory
+from utils.demand_graph import DemandGraph
+from utils.hand_tracker import HandTracker
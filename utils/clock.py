@@ -0,0 +1,28 @@
+import time
+
+
+class SystemClock(object):
+    """Wall clock used by the controllers when running live"""
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class VirtualClock(object):
+    """Clock that only moves when told to, for deterministic replays"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(seconds, 0.0)
+
+    def advance_to(self, timestamp):
+        # Never run backwards, a sleep may already have moved us past it
+        self.now = max(self.now, timestamp)
@@ -0,0 +1,41 @@
+class DemandGraph(object):
+    """Decides which per-frame computations actually have to run.
+
+    Built from {name: (dependencies, demand)}. demand is a callable taking
+    the frame's context dict and returning whether some consumer needs that
+    output this frame, or None for nodes that only run as a dependency of
+    another node. resolve() returns the demanded nodes plus everything they
+    depend on; the rest is skipped, and counted in `skipped`.
+    """
+
+    def __init__(self, nodes):
+        for name, (dependencies, _) in nodes.items():
+            for dependency in dependencies:
+                if dependency not in nodes:
+                    raise ValueError(f'{name!r} depends on unknown node {dependency!r}')
+        self.nodes = nodes
+        self.runs = dict.fromkeys(nodes, 0)
+        self.skipped = dict.fromkeys(nodes, 0)
+
+    def resolve(self, context):
+        """Set of node names to run for this context"""
+        needed = set()
+        pending = [name for name, (_, demand) in self.nodes.items()
+                   if demand is not None and demand(context)]
+        while pending:
+            name = pending.pop()
+            if name in needed:
+                continue
+            needed.add(name)
+            pending.extend(self.nodes[name][0])
+
+        for name in self.nodes:
+            if name in needed:
+                self.runs[name] += 1
+            else:
+                self.skipped[name] += 1
+        return needed
+
+    def stats(self):
+        return {name: {'runs': self.runs[name], 'skipped': self.skipped[name]}
+                for name in self.nodes}
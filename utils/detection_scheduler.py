@@ -0,0 +1,125 @@
+import threading
+
+import numpy as np
+
+from utils.hand_detector import DetectedHand
+
+
+class DetectionScheduler(object):
+    """Decides on which frames hand detection actually runs.
+
+    While the hand is nearly still the detector runs only every
+    max_interval frames; as soon as landmarks move faster than
+    motion_threshold (normalized image units per frame) or the hand sign
+    changes, it runs on every frame again. On skipped frames the last
+    detected landmarks are carried forward with a constant-velocity
+    prediction, so consumers still get landmarks every frame. MediaPipe
+    does not keep the order of several hands between frames, so hands are
+    paired with the previous detection by handedness and nearest wrist; a
+    hand without a partner gets no velocity.
+
+    notify_gestures() is called from the classify thread while the other
+    methods run on the detect thread, so the sign change flag is guarded by
+    a lock.
+    """
+
+    def __init__(self, max_interval=3, motion_threshold=0.01, max_match_distance=0.2):
+        self.max_interval = max(int(max_interval), 1)
+        self.motion_threshold = motion_threshold
+        # Wrist travel per frame (normalized) beyond which it is another hand
+        self.max_match_distance = max_match_distance
+
+        self.interval = 1
+        self._frames_since_detect = 0
+        self._hands = []
+        self._velocities = []  # (21, 3) per frame, one per hand
+        self._lock = threading.Lock()
+        self._force_detect = False
+        self._last_hand_sign_ids = None
+
+        # Counters
+        self.detector_runs = 0
+        self.predicted_frames = 0
+
+    def should_detect(self):
+        with self._lock:
+            force_detect = self._force_detect
+        if force_detect or not self._hands:
+            return True
+        return self._frames_since_detect + 1 >= self.interval
+
+    def update(self, hands):
+        """Feed the result of a detector run"""
+        # Take the flag now, a sign change notified from here on is kept
+        # for the next run instead of being cleared unseen
+        with self._lock:
+            force_detect = self._force_detect
+            self._force_detect = False
+        frames = max(self._frames_since_detect + 1, 1)
+        velocities = []
+        # A hand that disappeared counts as motion
+        motion = 0.0 if len(hands) == len(self._hands) else float('inf')
+        for current, match in zip(hands, self._match(hands, frames)):
+            if match is None:
+                # New hand, nothing to extrapolate from
+                velocities.append(np.zeros_like(current.landmarks))
+                motion = float('inf')
+                continue
+            velocity = (current.landmarks - self._hands[match].landmarks) / frames
+            velocities.append(velocity)
+            motion = max(motion, float(np.abs(velocity[:, :2]).mean()))
+
+        if motion > self.motion_threshold or force_detect:
+            self.interval = 1
+        else:
+            self.interval = min(self.interval + 1, self.max_interval)
+
+        self._hands = hands
+        self._velocities = velocities
+        self._frames_since_detect = 0
+        self.detector_runs += 1
+
+    def _match(self, hands, frames):
+        """Index into the previous hands for each hand, None if it has none"""
+        matches = []
+        unused = set(range(len(self._hands)))
+        for hand in hands:
+            best, best_distance = None, self.max_match_distance * frames
+            for index in unused:
+                previous = self._hands[index]
+                if previous.handedness != hand.handedness:
+                    continue
+                distance = float(np.hypot(*(hand.landmarks[0, :2] -
+                                            previous.landmarks[0, :2])))
+                if distance <= best_distance:
+                    best, best_distance = index, distance
+            unused.discard(best)
+            matches.append(best)
+        return matches
+
+    def predict(self):
+        """Landmarks for a frame the detector skipped"""
+        self._frames_since_detect += 1
+        self.predicted_frames += 1
+        # Never extrapolate further than one detection interval
+        frames = min(self._frames_since_detect, self.max_interval)
+        return [DetectedHand(hand.landmarks + velocity * frames,
+                             hand.handedness, hand.score)
+                for hand, velocity in zip(self._hands, self._velocities)]
+
+    def notify_gestures(self, hand_sign_ids):
+        """Detect on the next frame if the classified hand signs changed"""
+        hand_sign_ids = tuple(hand_sign_ids)
+        with self._lock:
+            if hand_sign_ids != self._last_hand_sign_ids:
+                self._force_detect = True
+                self._last_hand_sign_ids = hand_sign_ids
+
+    def stats(self):
+        total = self.detector_runs + self.predicted_frames
+        return {
+            'detector_runs': self.detector_runs,
+            'predicted_frames': self.predicted_frames,
+            'skipped_percent': round(100.0 * self.predicted_frames / total, 1) if total else 0.0,
+            'interval': self.interval,
+        }
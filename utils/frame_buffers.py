@@ -0,0 +1,41 @@
+import threading
+
+import numpy as np
+
+
+class FrameBufferPool(object):
+    """Recycles same-sized image buffers between frames.
+
+    acquire() hands out a free buffer and only allocates when every buffer
+    is still in flight, release() puts it back. Once the pipeline reaches
+    steady state `allocations` stops growing, which is how we check that
+    the frame path does no per-frame allocation.
+    """
+
+    def __init__(self, shape, dtype=np.uint8):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self._free = []
+        self._lock = threading.Lock()
+
+        self.allocations = 0
+
+    def acquire(self, shape=None):
+        shape = self.shape if shape is None else tuple(shape)
+        with self._lock:
+            if shape != self.shape:
+                # Camera changed resolution, start over with the new size
+                self.shape = shape
+                self._free = []
+            if self._free:
+                return self._free.pop()
+            self.allocations += 1
+        return np.empty(self.shape, dtype=self.dtype)
+
+    def release(self, buffer):
+        if buffer is None:
+            return
+        with self._lock:
+            if buffer.shape == self.shape:
+                self._free.append(buffer)
+
@@ -0,0 +1,136 @@
+import threading
+import time
+
+
+class FrameCapture(object):
+    """Grab camera frames on a background thread, newest frame wins.
+
+    Frames are written into a small ring of slots. ``read()`` always hands
+    back the most recent frame; frames that were overwritten before the
+    consumer asked for them are counted as dropped. Each slot is reused by
+    reading straight into it, so after the first lap around the ring no
+    new frame arrays are allocated.
+    """
+
+    def __init__(self, cap, buffer_len=3):
+        # One slot being written, one held by the consumer, one latest
+        if buffer_len < 3:
+            raise ValueError("buffer_len must be at least 3")
+
+        self._cap = cap
+        self._slots = [None] * buffer_len
+        self._frame_ids = [-1] * buffer_len
+        self._timestamps = [0.0] * buffer_len
+
+        self._latest = -1  # slot holding the newest frame
+        self._reading = -1  # slot currently handed out to the consumer
+        self._fresh = False  # latest frame not yet handed out
+        self._ended = False
+
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+        # Id / capture time of the frame returned by the last read()
+        self.frame_id = -1
+        self.timestamp = 0.0
+
+        # Counters
+        self.frames_captured = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+        self.allocations = 0
+
+    @property
+    def buffer_len(self):
+        return len(self._slots)
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run,
+                                        name="FrameCapture",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def _next_write_slot(self):
+        for offset in range(1, len(self._slots) + 1):
+            slot = (self._latest + offset) % len(self._slots)
+            if slot != self._latest and slot != self._reading:
+                return slot
+        return None
+
+    def _run(self):
+        while self._running:
+            with self._cond:
+                slot = self._next_write_slot()
+                buffer = self._slots[slot]
+
+            # Decode into the slot's existing array when there is one
+            if buffer is not None:
+                ret, frame = self._cap.read(buffer)
+            else:
+                ret, frame = self._cap.read()
+            timestamp = time.time()
+
+            with self._cond:
+                if not ret:
+                    self._ended = True
+                    self._cond.notify_all()
+                    break
+
+                if self._fresh:
+                    self.frames_dropped += 1
+                if frame is not buffer:
+                    self.allocations += 1
+
+                self._slots[slot] = frame
+                self._frame_ids[slot] = self.frames_captured
+                self._timestamps[slot] = timestamp
+                self._latest = slot
+                self._fresh = True
+                self.frames_captured += 1
+                self._cond.notify_all()
+
+    def read(self, timeout=None):
+        """Return (ret, frame) for the newest frame, blocking until one arrives.
+
+        The returned frame stays valid until the next call to read().
+        """
+        with self._cond:
+            self._reading = -1
+            while not self._fresh and not self._ended:
+                if not self._cond.wait(timeout):
+                    return False, None
+            if not self._fresh:
+                return False, None
+
+            slot = self._latest
+            self._reading = slot
+            self._fresh = False
+            self.frames_delivered += 1
+            self.frame_id = self._frame_ids[slot]
+            self.timestamp = self._timestamps[slot]
+            return True, self._slots[slot]
+
+    def stats(self):
+        with self._cond:
+            return {
+                'captured': self.frames_captured,
+                'delivered': self.frames_delivered,
+                'dropped': self.frames_dropped,
+                'allocations': self.allocations,
+                'buffer_len': len(self._slots),
+            }
+
+    def release(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        with self._cond:
+            self._ended = True
+            self._cond.notify_all()
+        self._cap.release()
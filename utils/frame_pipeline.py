@@ -0,0 +1,214 @@
+import queue
+import threading
+import time
+import traceback
+
+# Marks the end of the frame stream, never dropped by a queue
+_END = object()
+
+
+class StageQueue(object):
+    """Bounded queue connecting two pipeline stages.
+
+    policy='block' applies backpressure: the producer waits until the
+    consumer catches up. policy='drop_oldest' throws away the stalest
+    waiting item instead, so the consumer always works on the newest frame.
+    Dropped items are passed to on_drop so their buffers can be recycled.
+    """
+
+    POLICIES = ('drop_oldest', 'block')
+
+    def __init__(self, maxsize=1, policy='drop_oldest', on_drop=None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown queue policy: {policy}")
+        self._queue = queue.Queue(maxsize)
+        self.policy = policy
+        self.on_drop = on_drop
+
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, item, stop_event=None):
+        """Queue an item, returns False if the pipeline stopped while waiting"""
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                self.put_count += 1
+                return True
+            except queue.Full:
+                pass
+
+            if self.policy == 'drop_oldest' or item is _END:
+                try:
+                    stale = self._queue.get_nowait()
+                except queue.Empty:
+                    continue
+                self.dropped += 1
+                if self.on_drop is not None:
+                    self.on_drop(stale)
+            else:
+                if stop_event is not None and stop_event.is_set():
+                    return False
+                try:
+                    self._queue.put(item, timeout=0.1)
+                    self.put_count += 1
+                    return True
+                except queue.Full:
+                    continue
+
+    def get(self, timeout=None):
+        return self._queue.get(timeout=timeout)
+
+    def drain(self):
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _END and self.on_drop is not None:
+                self.on_drop(item)
+
+
+class FramePipeline(object):
+    """Chain of stages, each running on its own worker thread.
+
+    The source callable produces items (None ends the stream), every stage
+    callable maps an item to the next one (None discards it) and the final
+    results are pulled by the caller with get(). Stages are connected by
+    bounded StageQueues, so frame N can be detected while frame N-1 is
+    still being classified or rendered.
+    """
+
+    def __init__(self, source, queue_size=1, policy='drop_oldest',
+                 on_drop=None):
+        self._source = source
+        self._queue_size = queue_size
+        self._policy = policy
+        self._on_drop = on_drop
+        self._stages = []
+        self._queues = []
+        self._threads = []
+        self._stop_event = threading.Event()
+
+        self._processed = {}
+        self._discarded = {}
+        self._busy_time = {}
+
+    def add_stage(self, name, func):
+        if self._threads:
+            raise RuntimeError("Cannot add stages to a running pipeline")
+        self._stages.append((name, func))
+        return self
+
+    def start(self):
+        names = ['source'] + [name for name, _ in self._stages]
+        for name in names:
+            self._processed[name] = 0
+            self._discarded[name] = 0
+            self._busy_time[name] = 0.0
+
+        # queues[i] feeds stage i, the last one feeds the caller
+        self._queues = [
+            StageQueue(self._queue_size, self._policy, self._on_drop)
+            for _ in range(len(self._stages) + 1)
+        ]
+
+        self._threads.append(threading.Thread(target=self._run_source,
+                                              name='pipeline-source',
+                                              daemon=True))
+        for index, (name, func) in enumerate(self._stages):
+            self._threads.append(
+                threading.Thread(target=self._run_stage,
+                                 args=(name, func, self._queues[index],
+                                       self._queues[index + 1]),
+                                 name=f'pipeline-{name}',
+                                 daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def _run_source(self):
+        out_queue = self._queues[0]
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            try:
+                item = self._source()
+            except Exception:
+                traceback.print_exc()
+                item = None
+            self._busy_time['source'] += time.perf_counter() - start
+
+            if item is None:
+                break
+            self._processed['source'] += 1
+            if not out_queue.put(item, self._stop_event):
+                return
+        if not self._stop_event.is_set():
+            out_queue.put(_END)
+
+    def _run_stage(self, name, func, in_queue, out_queue):
+        while True:
+            try:
+                item = in_queue.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop_event.is_set():
+                    return
+                continue
+
+            if item is _END:
+                out_queue.put(_END)
+                return
+
+            start = time.perf_counter()
+            try:
+                result = func(item)
+            except Exception:
+                traceback.print_exc()
+                self._stop_event.set()
+                out_queue.put(_END)
+                return
+            self._busy_time[name] += time.perf_counter() - start
+
+            if result is None:
+                self._discarded[name] += 1
+                continue
+            self._processed[name] += 1
+            if not out_queue.put(result, self._stop_event):
+                return
+
+    def get(self, timeout=None):
+        """Next finished item, None once the stream has ended.
+
+        Raises queue.Empty if nothing finished within timeout.
+        """
+        item = self._queues[-1].get(timeout=timeout)
+        if item is _END:
+            return None
+        return item
+
+    def stop(self):
+        self._stop_event.set()
+        for stage_queue in self._queues:
+            stage_queue.drain()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        for stage_queue in self._queues:
+            stage_queue.drain()
+        self._threads = []
+
+    def stats(self):
+        names = ['source'] + [name for name, _ in self._stages]
+        stats = {}
+        for index, name in enumerate(names):
+            processed = self._processed.get(name, 0)
+            stats[name] = {
+                'processed': processed,
+                'discarded': self._discarded.get(name, 0),
+                # Items thrown away because the next stage was still busy
+                'dropped': self._queues[index].dropped if self._queues else 0,
+                'avg_ms': (self._busy_time.get(name, 0.0) * 1000.0 /
+                           processed) if processed else 0.0,
+            }
+        return stats
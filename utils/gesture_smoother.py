@@ -0,0 +1,64 @@
+from collections import deque
+
+
+class GestureSmoother(object):
+    """Temporal vote over the last `window` gesture IDs, with hysteresis.
+
+    Every update adds the new ID's weight (e.g. its classifier score) to a
+    running per-class total and subtracts the weight of the vote that fell
+    out of the window, so the cost does not depend on the window length.
+    The reported gesture only switches once another class leads it by at
+    least min_lead, which keeps a single misclassified frame from flipping
+    the result. window=1 passes IDs through unchanged.
+    """
+
+    def __init__(self, window=5, min_lead=1.0):
+        self.window = max(int(window), 1)
+        self.min_lead = min_lead
+        self._votes = deque()
+        self._totals = {}
+        self.current = None
+
+    def update(self, gesture_id, weight=1.0):
+        """Add one frame's gesture ID, returns the smoothed ID"""
+        if self.window == 1:
+            self.current = gesture_id
+            return gesture_id
+
+        self._votes.append((gesture_id, weight))
+        self._totals[gesture_id] = self._totals.get(gesture_id, 0.0) + weight
+
+        current_dropped = False
+        if len(self._votes) > self.window:
+            old_id, old_weight = self._votes.popleft()
+            total = self._totals[old_id] - old_weight
+            if total <= 1e-9 and old_id != gesture_id:
+                del self._totals[old_id]
+            else:
+                self._totals[old_id] = total
+            current_dropped = old_id == self.current
+
+        if self.current is None:
+            self.current = gesture_id
+        elif self.current not in self._totals:
+            # Left the window entirely, nothing to hold on to
+            self.current = max(self._totals, key=self._totals.get)
+        elif current_dropped:
+            # The leader lost a vote, any class may have overtaken it
+            # (bounded by the number of classes, not the window)
+            leader = max(self._totals, key=self._totals.get)
+            self._maybe_switch(leader)
+        else:
+            # Only the class that just gained a vote can have overtaken it
+            self._maybe_switch(gesture_id)
+        return self.current
+
+    def _maybe_switch(self, candidate):
+        if candidate != self.current and \
+                self._totals[candidate] - self._totals[self.current] >= self.min_lead:
+            self.current = candidate
+
+    def reset(self):
+        self._votes.clear()
+        self._totals.clear()
+        self.current = None
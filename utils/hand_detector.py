@@ -0,0 +1,167 @@
+import cv2 as cv
+import numpy as np
+
+from utils.landmarks import landmark_array
+
+
+class DetectedHand(object):
+    """One hand found by HandDetector, landmarks in full-frame coordinates"""
+    def __init__(self, landmarks, handedness, score):
+        self.landmarks = landmarks  # (21, 3) float32, normalized to the full frame
+        self.handedness = handedness  # 'Left' / 'Right'
+        self.score = score
+
+
+class HandDetector(object):
+    """Runs MediaPipe Hands and returns full-frame landmark arrays.
+
+    By default every frame goes to `hands` whole, so a tracking-mode
+    instance relies on MediaPipe's own tracking: it carries the hand ROI
+    from frame to frame and skips palm detection while it holds the hand.
+
+    roi=True, for static_image_mode instances only: once a hand has been
+    found, only a box around the previous detection (expanded by roi_margin
+    of its size on every side) is passed to MediaPipe. The whole frame is
+    used again when the hand is lost, and every full_frame_interval frames
+    so new hands can still be picked up. A tracking instance gains nothing
+    from it (it already skips palm detection, and MediaPipe resizes every
+    input to a fixed model size), and its carried ROI would not line up
+    from one crop to the next.
+
+    latency_budget: seconds hands.process may take. When the running average
+    goes over budget the input is downscaled (down to min_scale), and scaled
+    back up once there is headroom again. The aspect ratio is kept, so the
+    normalized ROI MediaPipe tracks stays valid across scale changes.
+
+    Landmarks are always mapped back to normalized full-frame coordinates, so
+    callers do not need to know which region was processed.
+    """
+
+    MIN_ROI_SIZE = 128  # pixels, below this the landmark model gets unreliable
+
+    def __init__(self, hands, roi=False, roi_margin=0.5, full_frame_interval=30,
+                 latency_budget=None, min_scale=0.5):
+        self.hands = hands
+        self.roi = roi
+        self.roi_margin = roi_margin
+        self.full_frame_interval = full_frame_interval
+        self.latency_budget = latency_budget
+        self.min_scale = min_scale
+
+        self.scale = 1.0
+        self._average_latency = None
+        self._last_box = None
+        self._frames_since_full = 0
+
+        # Counters
+        self.roi_runs = 0
+        self.full_frame_runs = 0
+        self.roi_misses = 0
+
+    def process(self, image, latency=None):
+        """Detect hands in an RGB image, returns a list of DetectedHand.
+
+        latency: how long the previous call took, drives the adaptive scale.
+        """
+        if latency is not None:
+            self._update_scale(latency)
+
+        image_height, image_width = image.shape[:2]
+        box = None
+        if self.roi and self._last_box is not None and \
+                self._frames_since_full < self.full_frame_interval:
+            box = self._expand_box(self._last_box, image_width, image_height)
+
+        hands = None
+        if box is not None:
+            self.roi_runs += 1
+            self._frames_since_full += 1
+            hands = self._run(image, box)
+            if not hands:
+                # Hand left the region, look at the whole frame this time
+                self.roi_misses += 1
+                hands = None
+
+        if hands is None:
+            self.full_frame_runs += 1
+            self._frames_since_full = 0
+            hands = self._run(image, (0, 0, image_width, image_height))
+
+        self._last_box = self._union_box(hands, image_width, image_height)
+        return hands
+
+    def _run(self, image, box):
+        x1, y1, x2, y2 = box
+        image_height, image_width = image.shape[:2]
+        crop = image[y1:y2, x1:x2]
+        crop_width, crop_height = x2 - x1, y2 - y1
+
+        if self.scale < 1.0:
+            size = (max(int(crop_width * self.scale), 1),
+                    max(int(crop_height * self.scale), 1))
+            crop = cv.resize(crop, size, interpolation=cv.INTER_AREA)
+        elif not crop.flags['C_CONTIGUOUS']:
+            crop = np.ascontiguousarray(crop)
+        crop.flags.writeable = False
+
+        results = self.hands.process(crop)
+        if results.multi_hand_landmarks is None:
+            return []
+
+        hands = []
+        for hand_landmarks, handedness in zip(results.multi_hand_landmarks,
+                                              results.multi_handedness):
+            landmarks = landmark_array(hand_landmarks)
+            if box != (0, 0, image_width, image_height):
+                # Crop-normalized -> full-frame-normalized
+                landmarks[:, 0] = (x1 + landmarks[:, 0] * crop_width) / image_width
+                landmarks[:, 1] = (y1 + landmarks[:, 1] * crop_height) / image_height
+                landmarks[:, 2] *= crop_width / image_width
+            classification = handedness.classification[0]
+            hands.append(DetectedHand(landmarks, classification.label,
+                                      classification.score))
+        return hands
+
+    def _expand_box(self, box, image_width, image_height):
+        x1, y1, x2, y2 = box
+        size = max(x2 - x1, y2 - y1, self.MIN_ROI_SIZE)
+        margin = size * self.roi_margin
+        center_x, center_y = (x1 + x2) / 2, (y1 + y2) / 2
+        half = size / 2 + margin
+        expanded = (max(int(center_x - half), 0),
+                    max(int(center_y - half), 0),
+                    min(int(center_x + half), image_width),
+                    min(int(center_y + half), image_height))
+        if expanded[2] - expanded[0] < 2 or expanded[3] - expanded[1] < 2:
+            return None
+        return expanded
+
+    @staticmethod
+    def _union_box(hands, image_width, image_height):
+        if not hands:
+            return None
+        points = np.concatenate([hand.landmarks[:, :2] for hand in hands])
+        x1, y1 = points.min(axis=0) * (image_width, image_height)
+        x2, y2 = points.max(axis=0) * (image_width, image_height)
+        return (x1, y1, x2, y2)
+
+    def _update_scale(self, latency):
+        if self.latency_budget is None:
+            return
+        if self._average_latency is None:
+            self._average_latency = latency
+        else:
+            self._average_latency = 0.8 * self._average_latency + 0.2 * latency
+
+        if self._average_latency > self.latency_budget:
+            self.scale = max(self.scale * 0.9, self.min_scale)
+        elif self._average_latency < 0.7 * self.latency_budget:
+            self.scale = min(self.scale * 1.05, 1.0)
+
+    def stats(self):
+        return {
+            'roi_runs': self.roi_runs,
+            'full_frame_runs': self.full_frame_runs,
+            'roi_misses': self.roi_misses,
+            'scale': round(self.scale, 2),
+        }
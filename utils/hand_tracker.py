@@ -0,0 +1,80 @@
+def landmark_box(landmarks):
+    """(x1, y1, x2, y2) around (21, 3) normalized landmarks"""
+    x1, y1 = landmarks[:, :2].min(axis=0)
+    x2, y2 = landmarks[:, :2].max(axis=0)
+    return (float(x1), float(y1), float(x2), float(y2))
+
+
+def box_iou(a, b):
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    intersection = width * height
+    union = ((a[2] - a[0]) * (a[3] - a[1]) +
+             (b[2] - b[0]) * (b[3] - b[1]) - intersection)
+    return intersection / union if union > 0 else 0.0
+
+
+class HandTracker(object):
+    """Gives every detected hand a track ID that is stable across frames.
+
+    A detection continues the track with the same handedness whose last box
+    overlaps it most (IoU >= iou_threshold), otherwise it starts a new track.
+    Tracks survive max_missed frames without a detection, so a single missed
+    detection does not reset per-hand state.
+    """
+
+    def __init__(self, iou_threshold=0.2, max_missed=5):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self._tracks = {}  # track ID -> [handedness, box, missed frames]
+        self._next_id = 0
+
+    def update(self, hands):
+        """Match DetectedHands to tracks.
+
+        Returns (track IDs in the order of `hands`, IDs of tracks that were
+        not seen this frame but are still alive, IDs of tracks dropped now).
+        """
+        boxes = [landmark_box(hand.landmarks) for hand in hands]
+
+        # Greedy matching, best overlap first
+        pairs = []
+        for index, (hand, box) in enumerate(zip(hands, boxes)):
+            for track_id, (handedness, track_box, _) in self._tracks.items():
+                if handedness != hand.handedness:
+                    continue
+                iou = box_iou(box, track_box)
+                if iou >= self.iou_threshold:
+                    pairs.append((iou, index, track_id))
+        pairs.sort(reverse=True)
+
+        track_ids = [None] * len(hands)
+        matched = set()
+        for _, index, track_id in pairs:
+            if track_ids[index] is None and track_id not in matched:
+                track_ids[index] = track_id
+                matched.add(track_id)
+
+        for index, hand in enumerate(hands):
+            if track_ids[index] is None:
+                track_ids[index] = self._next_id
+                self._next_id += 1
+            self._tracks[track_ids[index]] = [hand.handedness, boxes[index], 0]
+
+        missed, dropped = [], []
+        for track_id in list(self._tracks):
+            if track_id in track_ids:
+                continue
+            track = self._tracks[track_id]
+            track[2] += 1
+            if track[2] > self.max_missed:
+                del self._tracks[track_id]
+                dropped.append(track_id)
+            else:
+                missed.append(track_id)
+        return track_ids, missed, dropped
+
+    def active_ids(self):
+        return list(self._tracks)
@@ -0,0 +1,44 @@
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+
+def landmark_array(hand_landmarks):
+    """MediaPipe NormalizedLandmarkList -> (21, 3) float32 array of x, y, z.
+
+    This is the only place the protobuf landmarks are walked, everything
+    downstream works on the array.
+    """
+    return np.array([(landmark.x, landmark.y, landmark.z)
+                     for landmark in hand_landmarks.landmark],
+                    dtype=np.float32)
+
+
+def calc_landmark_list(landmarks, image_width, image_height):
+    """(21, 2) int32 pixel coordinates, clipped to the right/bottom edge"""
+    # float64 so the truncation matches int(landmark.x * image_width) exactly
+    pixels = (landmarks[:, :2].astype(np.float64) *
+              (image_width, image_height)).astype(np.int32)
+    np.minimum(pixels, (image_width - 1, image_height - 1), out=pixels)
+    return pixels
+
+
+def calc_bounding_rect(landmark_list):
+    """[x1, y1, x2, y2] around the pixel landmarks, same as cv.boundingRect"""
+    x_min, y_min = landmark_list.min(axis=0)
+    x_max, y_max = landmark_list.max(axis=0)
+    return [int(x_min), int(y_min), int(x_max) + 1, int(y_max) + 1]
+
+
+def pre_process_landmark(landmark_list):
+    """Wrist-relative pixel landmarks scaled to [-1, 1], as a (42,) float32 vector"""
+    landmark_list = np.asarray(landmark_list)
+
+    # Convert to relative coordinates, then to a one-dimensional vector
+    relative = (landmark_list - landmark_list[0]).ravel()
+
+    # Normalization, in float64 like the training data was
+    max_value = np.abs(relative).max()
+    if max_value == 0:
+        return relative.astype(np.float32)
+    return (relative / max_value).astype(np.float32)
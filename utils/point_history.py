@@ -0,0 +1,65 @@
+import numpy as np
+
+
+class PointHistory(object):
+    """Last `maxlen` tracked finger points in a preallocated ring buffer.
+
+    Every point (and its timestamp) is written twice, at slot i and at
+    i + maxlen, so the history in chronological order is always one
+    contiguous slice: points() is a view, never a copy. [0, 0] entries are
+    separators for frames where no point was tracked, as before.
+    """
+
+    def __init__(self, maxlen=16):
+        self.maxlen = maxlen
+        self._points = np.zeros((2 * maxlen, 2), dtype=np.int32)
+        self._timestamps = np.zeros(2 * maxlen, dtype=np.float64)
+        self._next = 0
+        self._len = 0
+
+        # Scratch buffers for features()
+        self._relative = np.empty((maxlen, 2), dtype=np.float64)
+        self._features = np.empty(2 * maxlen, dtype=np.float32)
+
+    def __len__(self):
+        return self._len
+
+    def append(self, point, timestamp=0.0):
+        index = self._next
+        self._points[index] = point
+        self._points[index + self.maxlen] = point
+        self._timestamps[index] = timestamp
+        self._timestamps[index + self.maxlen] = timestamp
+        self._next = (index + 1) % self.maxlen
+        self._len = min(self._len + 1, self.maxlen)
+
+    def _window(self):
+        start = (self._next - self._len) % self.maxlen
+        return slice(start, start + self._len)
+
+    def points(self):
+        """(len, 2) int32 view, oldest first. Changes with the next append()"""
+        return self._points[self._window()]
+
+    def timestamps(self):
+        """(len,) float64 view matching points()"""
+        return self._timestamps[self._window()]
+
+    def snapshot(self):
+        """Copy of points(), safe to hand to another thread"""
+        return self.points().copy()
+
+    def features(self, image_width, image_height):
+        """Point history classifier input, (2 * len,) float32.
+
+        Points relative to the oldest one, divided by the image size, then
+        flattened. Computed in float64 like the training data, into a reused
+        buffer that the next call overwrites.
+        """
+        points = self.points()
+        relative = self._relative[:len(points)]
+        np.subtract(points, points[:1], out=relative)
+        relative /= (image_width, image_height)
+        features = self._features[:relative.size]
+        features[:] = relative.ravel()
+        return features
@@ -0,0 +1,191 @@
+import os
+
+import numpy as np
+
+MAGIC = b'HGSR'
+VERSION = 2
+
+NUM_LANDMARKS = 21
+
+HANDEDNESS_CODES = {'Left': 0, 'Right': 1}
+HANDEDNESS_LABELS = {code: label for label, code in HANDEDNESS_CODES.items()}
+
+# File header, padded to 16 bytes
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S4'),
+    ('version', '<u2'),
+    ('record_size', '<u2'),
+    ('width', '<u2'),
+    ('height', '<u2'),
+    ('reserved', '<u4'),
+])
+
+# One record per detected hand per frame, keyed by the hand's HandTracker
+# ID so every hand can be replayed with its own state. Frames without a
+# hand get a single record with track_id -1. `predicted` marks frames whose
+# landmarks the DetectionScheduler extrapolated instead of detecting. Landmarks and scores are
+# float32, the capture timestamp stays float64 so epoch seconds keep sub-ms
+# precision. Version 1 stored the hand's index in the frame instead.
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('frame_id', '<u4'),
+    ('track_id', '<i4'),
+    ('handedness', 'i1'),  # 0 = Left, 1 = Right, -1 = unknown
+    ('predicted', '?'),
+    ('hand_sign_id', '<i2'),
+    ('finger_gesture_id', '<i2'),
+    ('score', '<f4'),
+    ('landmarks', '<f4', (NUM_LANDMARKS, 3)),  # normalized x, y, z
+])
+
+
+class SessionRecorder(object):
+    """Appends every frame's raw landmarks to a fixed-record binary file.
+
+    Re-opening an existing file keeps appending to it, as long as it was
+    written with the same record layout.
+    """
+
+    def __init__(self, path, width, height, flush_every=30):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.flush_every = flush_every
+        self.records_written = 0
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            header = _read_header(path)
+            if (header['width'], header['height']) != (width, height):
+                raise ValueError(
+                    f"{path} was recorded at {header['width']}x{header['height']}")
+            self._file = open(path, 'ab')
+            # Drop a partially written record left by a crash
+            self._file.truncate(_data_end(path))
+        else:
+            self._file = open(path, 'wb')
+            header = np.zeros(1, dtype=HEADER_DTYPE)
+            header['magic'] = MAGIC
+            header['version'] = VERSION
+            header['record_size'] = RECORD_DTYPE.itemsize
+            header['width'] = width
+            header['height'] = height
+            self._file.write(header.tobytes())
+
+        # Reused for every write, grown when a frame has more hands
+        self._records = np.zeros(1, dtype=RECORD_DTYPE)
+
+    def write(self, frame_id, timestamp, hands=(), predicted=False):
+        """Record one frame.
+
+        hands: iterable of (landmarks, handedness, score, hand_sign_id,
+        finger_gesture_id, track_id), landmarks being 21 normalized (x, y, z)
+        points and handedness 'Left' / 'Right'.
+        predicted: the landmarks were extrapolated, not detected.
+        """
+        hands = list(hands)
+        count = max(len(hands), 1)
+        if len(self._records) < count:
+            self._records = np.zeros(count, dtype=RECORD_DTYPE)
+        records = self._records[:count]
+
+        records['timestamp'] = timestamp
+        records['frame_id'] = frame_id
+        records['predicted'] = predicted
+        if not hands:
+            records['track_id'] = -1
+            records['handedness'] = -1
+            records['hand_sign_id'] = -1
+            records['finger_gesture_id'] = -1
+            records['score'] = 0.0
+            records['landmarks'] = np.nan
+        for index, (landmarks, handedness, score, hand_sign_id,
+                    finger_gesture_id, track_id) in enumerate(hands):
+            record = records[index]
+            record['track_id'] = track_id
+            record['handedness'] = HANDEDNESS_CODES.get(handedness, -1)
+            record['hand_sign_id'] = hand_sign_id
+            record['finger_gesture_id'] = finger_gesture_id
+            record['score'] = score
+            record['landmarks'] = landmarks
+
+        self._file.write(records.tobytes())
+        self.records_written += count
+        if self.records_written % self.flush_every < count:
+            self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class SessionReader(object):
+    """Memory-maps a recorded session, nothing is read until it is sliced.
+
+    Indexing returns structured numpy records (see RECORD_DTYPE); slices are
+    views into the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        header = _read_header(path)
+        self.width = int(header['width'])
+        self.height = int(header['height'])
+
+        count = (_data_end(path) - HEADER_DTYPE.itemsize) // RECORD_DTYPE.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode='r',
+                                     offset=HEADER_DTYPE.itemsize,
+                                     shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    @property
+    def duration(self):
+        if len(self.records) == 0:
+            return 0.0
+        return float(self.records['timestamp'][-1] - self.records['timestamp'][0])
+
+    def time_slice(self, start=None, end=None):
+        """Records captured in [start, end), seconds from the session start"""
+        timestamps = self.records['timestamp']
+        if len(timestamps) == 0:
+            return self.records
+        origin = timestamps[0]
+        first = 0 if start is None else np.searchsorted(timestamps, origin + start)
+        last = len(timestamps) if end is None else np.searchsorted(timestamps, origin + end)
+        return self.records[first:last]
+
+    def frames(self, records=None):
+        """Group records by frame, yields (frame_id, timestamp, records)"""
+        records = self.records if records is None else records
+        if len(records) == 0:
+            return
+        frame_ids = records['frame_id']
+        boundaries = np.flatnonzero(frame_ids[1:] != frame_ids[:-1]) + 1
+        start = 0
+        for end in list(boundaries) + [len(records)]:
+            frame = records[start:end]
+            yield int(frame_ids[start]), float(frame['timestamp'][0]), frame
+            start = end
+
+
+def _read_header(path):
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) == 0 or header['magic'][0] != MAGIC:
+        raise ValueError(f"{path} is not a recorded session")
+    if header['version'][0] != VERSION or header['record_size'][0] != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} uses an unsupported record layout")
+    return header[0]
+
+
+def _data_end(path):
+    """File offset after the last complete record"""
+    size = os.path.getsize(path)
+    records = max(size - HEADER_DTYPE.itemsize, 0) // RECORD_DTYPE.itemsize
+    return HEADER_DTYPE.itemsize + records * RECORD_DTYPE.itemsize
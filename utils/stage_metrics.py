@@ -0,0 +1,179 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+
+class LatencyHistogram(object):
+    """Fixed log-bucket latency histogram, O(1) per sample.
+
+    Buckets grow by 10% from 10 us up to ~100 s, so reported percentiles are
+    within 10% of the true value. Samples are in seconds.
+    """
+
+    MIN_SECONDS = 1e-5
+    GROWTH = 1.1
+    NUM_BUCKETS = 170
+
+    _LOG_GROWTH = math.log(GROWTH)
+
+    def __init__(self):
+        self.counts = [0] * self.NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        if seconds <= self.MIN_SECONDS:
+            index = 0
+        else:
+            index = min(int(math.log(seconds / self.MIN_SECONDS) / self._LOG_GROWTH) + 1,
+                        self.NUM_BUCKETS - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, percent):
+        """Upper bound of the bucket holding the given percentile, in seconds"""
+        if self.count == 0:
+            return 0.0
+        rank = math.ceil(self.count * percent / 100.0)
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                upper = self.MIN_SECONDS * self.GROWTH ** index
+                return min(upper, self.max)
+        return self.max
+
+    def reset(self):
+        self.counts = [0] * self.NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class StageMetrics(object):
+    """Per-stage latency histograms for the frame loop.
+
+    Each pipeline stage records into its own histogram with record(), the
+    main loop calls tick() once per displayed frame to get the FPS, and
+    increment() keeps plain event counters. Results can be written
+    periodically as JSON or Prometheus text (chosen by the file extension,
+    .json or anything else).
+    """
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, path=None, dump_interval=5.0, fps_window=10):
+        self.path = path
+        self.dump_interval = dump_interval
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._last_dump = time.perf_counter()
+
+        self._last_tick = None
+        self._frame_intervals = deque(maxlen=fps_window)
+
+    def histogram(self, name):
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def record(self, name, seconds):
+        self.histogram(name).record(seconds)
+
+    def increment(self, name, amount=1):
+        """Add to a plain event counter (e.g. skipped model invocations)"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def tick(self):
+        """Mark a finished frame, returns the rolling average FPS"""
+        now = time.perf_counter()
+        if self._last_tick is not None:
+            interval = now - self._last_tick
+            self._frame_intervals.append(interval)
+            self.record('frame_interval', interval)
+        self._last_tick = now
+
+        if not self._frame_intervals:
+            return 0.0
+        average = sum(self._frame_intervals) / len(self._frame_intervals)
+        return round(1.0 / average, 2) if average > 0 else 0.0
+
+    def snapshot(self):
+        """{stage: {count, mean, p50, p95, p99, max}} with times in ms"""
+        snapshot = {}
+        for name, histogram in list(self._histograms.items()):
+            if histogram.count == 0:
+                continue
+            stats = {
+                'count': histogram.count,
+                'mean': histogram.total / histogram.count * 1000.0,
+            }
+            for percent in self.PERCENTILES:
+                stats[f'p{percent}'] = histogram.percentile(percent) * 1000.0
+            stats['max'] = histogram.max * 1000.0
+            snapshot[name] = stats
+        return snapshot
+
+    def maybe_dump(self):
+        """Write the metrics file if dump_interval has passed since the last one"""
+        if self.path is None:
+            return False
+        now = time.perf_counter()
+        if now - self._last_dump < self.dump_interval:
+            return False
+        self._last_dump = now
+        self.dump()
+        return True
+
+    def dump(self, path=None):
+        path = path or self.path
+        if path is None:
+            return
+        if path.endswith('.json'):
+            snapshot = self.snapshot()
+            counters = self.counters()
+            if counters:
+                snapshot['counters'] = counters
+            text = json.dumps(snapshot, indent=2, sort_keys=True) + '\n'
+        else:
+            text = self.prometheus_text()
+
+        # Write then rename so readers never see a half written file
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def prometheus_text(self):
+        metric = 'hand_gesture_stage_latency_seconds'
+        lines = [f'# TYPE {metric} summary']
+        for name, histogram in sorted(self._histograms.items()):
+            if histogram.count == 0:
+                continue
+            for percent in self.PERCENTILES:
+                lines.append(f'{metric}{{stage="{name}",quantile="{percent / 100}"}} '
+                             f'{histogram.percentile(percent):.6f}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {histogram.total:.6f}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {histogram.count}')
+
+        counters = self.counters()
+        if counters:
+            lines.append('# TYPE hand_gesture_events_total counter')
+            for name, value in sorted(counters.items()):
+                lines.append(f'hand_gesture_events_total{{event="{name}"}} {value}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,41 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfile(object):
+    """Wall-clock breakdown of app startup.
+
+    Phases are timed with phase() (a context manager) or add(), and may run
+    concurrently on different threads, so report() shows when each one
+    started as well as how long it took.
+    """
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self._phases = []  # (name, start offset, seconds)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter() - start)
+
+    def add(self, name, start, seconds):
+        with self._lock:
+            self._phases.append((name, start - self.start, seconds))
+
+    def report(self):
+        lines = ['Startup profile (s):',
+                 f'  {"phase":<24} {"start":>7} {"took":>7}']
+        with self._lock:
+            phases = sorted(self._phases, key=lambda phase: phase[1])
+        for name, offset, seconds in phases:
+            lines.append(f'  {name:<24} {offset:7.3f} {seconds:7.3f}')
+        if phases:
+            total = max(offset + seconds for _, offset, seconds in phases)
+            lines.append(f'  {"total":<24} {0.0:7.3f} {total:7.3f}')
+        return '\n'.join(lines)